@@ -1,7 +1,15 @@
 # ai/adapters.py
 import os
+import random
+import asyncio
 import logging
-from openai import OpenAI
+import itertools
+import threading
+import httpx
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError
+from ai.cache import response_cache, semantic_cache, cache_key, LLM_EMBEDDING_MODEL
+from ai.ratelimit import AsyncLimiter
+from ai.jsonscan import JsonObjectScanner
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -9,35 +17,242 @@ logger = logging.getLogger(__name__)
 
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 OPENROUTER_KEY = os.getenv("OPENROUTER_API_KEY")
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "local")  # "openai", "openrouter", or "local"
+
+
+def _keys_from_env(list_var: str, single_key: str) -> list:
+    """Comma-separated key list from list_var, falling back to the single key"""
+    keys = [k.strip() for k in os.getenv(list_var, "").split(",") if k.strip()]
+    return keys or ([single_key] if single_key else [])
+
+
+# Optional comma-separated key lists for spreading load across accounts/endpoints
+OPENAI_KEYS = _keys_from_env("OPENAI_API_KEYS", OPENAI_KEY)
+OPENROUTER_KEYS = _keys_from_env("OPENROUTER_API_KEYS", OPENROUTER_KEY)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "local").lower()  # "openai", "openrouter", or "local"
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-3.5-turbo")
 
 # Configuration
 HTTP_REFERER = os.getenv("HTTP_REFERER", "https://github.com/k8s-ai-assistant")
 APP_TITLE = os.getenv("APP_TITLE", "K8s AI Assistant")
 
+# Stream completions and stop reading once the reply's JSON object is complete
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() == "true"
+
+# Shared HTTP connection pool so keep-alive connections are reused across chat() calls
+_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+_http_client = None
+_http_client_users = 0
+
+# Client-side throttling, one semaphore/limiter pair per API key (provider limits are per key)
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "8"))
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_MAX_ATTEMPTS = 3
+LLM_RETRY_BASE_DELAY = 1.0  # seconds, doubled per attempt
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError)
+_throttles = {}
+
+# Cache key -> Future of the completion currently being fetched for it
+_inflight = {}
+
+
+def _get_throttle(api_key: str):
+    """Return the (semaphore, rate limiter) pair for api_key, created inside the running loop."""
+    throttle = _throttles.get(api_key)
+    if throttle is None:
+        throttle = _throttles[api_key] = (asyncio.Semaphore(LLM_MAX_CONCURRENT), AsyncLimiter(LLM_RPM, 60.0))
+    return throttle
+
+
+def _acquire_http_client() -> httpx.AsyncClient:
+    """Return the module-level pooled HTTP client, creating it on first use."""
+    global _http_client, _http_client_users
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=True)
+    _http_client_users += 1
+    return _http_client
+
+
+async def _release_http_client():
+    """Close the pooled HTTP client once the last adapter using it is closed."""
+    global _http_client_users
+    _http_client_users = max(_http_client_users - 1, 0)
+    if _http_client_users == 0 and _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
 
-class OpenAIAdapter:
+
+async def _collect_stream(stream) -> str:
+    """Join streamed deltas, closing the stream as soon as the top-level JSON object ends"""
+    parts = []
+    scanner = JsonObjectScanner()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                # Anything after the closing brace is chatter we'd strip anyway
+                if scanner.feed(delta) >= 0:
+                    break
+    finally:
+        await stream.close()
+    return "".join(parts)
+
+
+class _RemoteAdapter:
+    """Shared plumbing for API-backed adapters: pooled HTTP client and response cache"""
+    _closed = True
+    model = None
+    provider = "LLM"
+
+    def _pooled_http_client(self) -> httpx.AsyncClient:
+        self._closed = False
+        return _acquire_http_client()
+
+    def _init_clients(self, api_keys: list, **client_kwargs):
+        """Build one client per key over the shared pool; calls are spread round-robin"""
+        http_client = self._pooled_http_client()
+        # Retries are handled by _complete_with_retry
+        self.clients = [
+            (AsyncOpenAI(api_key=key, http_client=http_client, max_retries=0, **client_kwargs), key)
+            for key in api_keys
+        ]
+        self._client_cycle = itertools.cycle(range(len(self.clients)))
+        self._client_cycle_lock = threading.Lock()
+
+    def _next_client(self):
+        with self._client_cycle_lock:
+            client, key = self.clients[next(self._client_cycle)]
+        return client, _get_throttle(key)
+
+    async def aclose(self):
+        """Release this adapter's hold on the pooled sockets."""
+        if not self._closed:
+            self._closed = True
+            await _release_http_client()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def chat(self, messages: list, max_tokens: int = 1024, temperature: float = 0.0):
+        # Only deterministic (temperature 0) completions are safe to replay or share
+        if temperature != 0:
+            return await self._complete_with_retry(messages, max_tokens, temperature)
+        
+        key = cache_key(self.model, messages, max_tokens, temperature)
+        if response_cache is not None:
+            cached = response_cache.get(key)
+            if cached is not None:
+                logger.debug("LLM cache hit")
+                return cached
+        
+        # Coalesce identical concurrent requests: later callers await the first one's result.
+        # No await happens between the lookup and the insert, so no lock is needed.
+        pending = _inflight.get(key)
+        if pending is not None:
+            logger.debug("LLM request coalesced with in-flight call")
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            content = await self._chat_uncached(messages, max_tokens, temperature)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved so an unshared failure isn't logged twice
+            raise
+        finally:
+            del _inflight[key]
+        
+        future.set_result(content)
+        if response_cache is not None:
+            response_cache.set(key, content, model=self.model)
+        return content
+    
+    async def _chat_uncached(self, messages: list, max_tokens: int, temperature: float) -> str:
+        # Semantic tier: only for the opening turn (system prompts + question), never once tool results are in play
+        scope = vector = None
+        if semantic_cache is not None and not any(m["role"] == "assistant" for m in messages):
+            scope = cache_key(self.model, messages[:-1], max_tokens, temperature)
+            vector = await self._embed(messages[-1]["content"])
+            hit = semantic_cache.get(scope, vector) if vector is not None else None
+            if hit is not None:
+                content, matched_user = hit
+                logger.debug(f"LLM semantic cache hit (matched: {matched_user[:80]})")
+                return content
+        
+        content = await self._complete_with_retry(messages, max_tokens, temperature)
+        
+        if vector is not None:
+            semantic_cache.set(scope, vector, messages[-1]["content"], content)
+        return content
+    
+    async def _embed(self, text: str):
+        """Embedding for the semantic cache, or None if the provider can't produce one"""
+        client, _ = self._next_client()
+        try:
+            response = await client.embeddings.create(model=LLM_EMBEDDING_MODEL, input=text)
+            return response.data[0].embedding
+        except Exception as e:
+            logger.debug(f"Embedding failed, skipping semantic cache: {e}")
+            return None
+    
+    async def _complete_with_retry(self, messages: list, max_tokens: int, temperature: float) -> str:
+        """Call _complete under the per-key concurrency/RPM caps, backing off on 429s and network errors"""
+        for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+            # Each attempt takes the next client, so a retry after a 429 lands on another key
+            client, (semaphore, limiter) = self._next_client()
+            try:
+                async with semaphore, limiter:
+                    return await self._complete(client, messages, max_tokens, temperature)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == LLM_MAX_ATTEMPTS:
+                    logger.error(f"{self.provider} API error: {str(e)}")
+                    raise RuntimeError(f"{self.provider} API error: {str(e)}") from e
+                delay = LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, 0.5)
+                logger.warning(f"{self.provider} request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _complete(self, client: AsyncOpenAI, messages: list, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+
+class OpenAIAdapter(_RemoteAdapter):
     """Adapter for OpenAI API"""
-    def __init__(self):
-        if not OPENAI_KEY:
+    provider = "OpenAI"
+    
+    def __init__(self, api_keys: list = None):
+        api_keys = api_keys or OPENAI_KEYS
+        if not api_keys:
             raise RuntimeError("OPENAI_API_KEY not set")
-        self.client = OpenAI(api_key=OPENAI_KEY)
+        self._init_clients(api_keys)
         self.model = "gpt-4o-mini"
-        logger.info(f"🤖 Using OpenAI with model: {self.model}")
+        logger.info(f"🤖 Using OpenAI with model: {self.model} ({len(self.clients)} key(s))")
     
-    def chat(self, system: str, user: str, max_tokens: int = 1024, temperature: float = 0.0):
+    async def _complete(self, client: AsyncOpenAI, messages: list, max_tokens: int, temperature: float) -> str:
         try:
-            messages = [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ]
-            response = self.client.chat.completions.create(
+            request = dict(
                 model=self.model,
                 messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature
             )
             
+            if LLM_STREAM:
+                content = await _collect_stream(await client.chat.completions.create(**request, stream=True))
+                if not content:
+                    raise RuntimeError("OpenAI returned empty stream")
+                return content
+            
+            response = await client.chat.completions.create(**request)
+            
             # Check if we got a valid response
             if not response.choices or len(response.choices) == 0:
                 raise RuntimeError("OpenAI returned empty choices")
@@ -47,33 +262,30 @@ class OpenAIAdapter:
                 raise RuntimeError("OpenAI returned None content")
             
             return content
+        except _RETRYABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
             raise RuntimeError(f"OpenAI API error: {str(e)}") from e
 
 
-class OpenRouterAdapter:
+class OpenRouterAdapter(_RemoteAdapter):
     """Adapter for OpenRouter API (supports free models)"""
-    def __init__(self, model: str = "openai/gpt-3.5-turbo"):
-        if not OPENROUTER_KEY:
+    provider = "OpenRouter"
+    
+    def __init__(self, model: str = OPENROUTER_MODEL, api_keys: list = None):
+        api_keys = api_keys or OPENROUTER_KEYS
+        if not api_keys:
             raise RuntimeError("OPENROUTER_API_KEY not set. Get one free at https://openrouter.ai/keys")
         
         # OpenRouter uses OpenAI-compatible API
-        self.client = OpenAI(
-            api_key=OPENROUTER_KEY,
-            base_url="https://openrouter.ai/api/v1"
-        )
+        self._init_clients(api_keys, base_url="https://openrouter.ai/api/v1")
         self.model = model
-        logger.info(f"🌐 Using OpenRouter with model: {model}")
+        logger.info(f"🌐 Using OpenRouter with model: {model} ({len(self.clients)} key(s))")
     
-    def chat(self, system: str, user: str, max_tokens: int = 1024, temperature: float = 0.0):
+    async def _complete(self, client: AsyncOpenAI, messages: list, max_tokens: int, temperature: float) -> str:
         try:
-            messages = [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ]
-            
-            response = self.client.chat.completions.create(
+            request = dict(
                 model=self.model,
                 messages=messages,
                 max_tokens=max_tokens,
@@ -84,6 +296,14 @@ class OpenRouterAdapter:
                 }
             )
             
+            if LLM_STREAM:
+                content = await _collect_stream(await client.chat.completions.create(**request, stream=True))
+                if not content:
+                    raise RuntimeError("OpenRouter returned empty stream. This may indicate rate limiting, insufficient credits, or model unavailability.")
+                return content
+            
+            response = await client.chat.completions.create(**request)
+            
             # Validate response structure
             if not response.choices or len(response.choices) == 0:
                 raise RuntimeError("OpenRouter returned empty choices array")
@@ -99,33 +319,42 @@ class OpenRouterAdapter:
             
             return content
             
+        except _RETRYABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"OpenRouter API error: {str(e)}")
             # Re-raise the exception so the agent can handle it properly
             raise RuntimeError(f"OpenRouter API error: {str(e)}") from e
 
 
+# Canned LocalAdapter replies as compact JSON bytes, which the agent parses without cleanup
+_LOCAL_TOOL_CALL = b'{"tool_call":{"name":"get_pods","args":{"namespace":"default"}}}'
+_LOCAL_FINAL = (
+    b'{"final_response":{'
+    b'"analysis":"Cluster analysis complete. Found pods in default namespace.",'
+    b'"recommendation":"All systems appear operational.",'
+    b'"kubectl":"kubectl get pods -n default",'
+    b'"confidence":0.85,'
+    b'"post_checks":["Monitor pod restarts","Check resource usage"]}}'
+)
+
+
 class LocalAdapter:
     """Local adapter for offline testing"""
     def __init__(self):
         self.call_count = 0
         logger.info("🔌 Using Local Adapter (no API calls)")
     
-    def chat(self, system: str, user: str, **kwargs):
+    async def aclose(self):
+        """Nothing to release; present for interface parity with remote adapters"""
+    
+    async def chat(self, messages: list, **kwargs):
         """Simple deterministic behavior for testing"""
         self.call_count += 1
         
-        # First call: request pods
-        if self.call_count == 1:
-            return '{"tool_call": {"name": "get_pods", "args": {"namespace": "default"}}}'
+        # No tool result yet: request pods
+        if not any(m["role"] == "assistant" for m in messages):
+            return _LOCAL_TOOL_CALL
         
-        # Second call: return final response
-        return '''{
-            "final_response": {
-                "analysis": "Cluster analysis complete. Found pods in default namespace.",
-                "recommendation": "All systems appear operational.",
-                "kubectl": "kubectl get pods -n default",
-                "confidence": 0.85,
-                "post_checks": ["Monitor pod restarts", "Check resource usage"]
-            }
-        }'''
\ No newline at end of file
+        # Tool result received: return final response
+        return _LOCAL_FINAL
\ No newline at end of file
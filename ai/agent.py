@@ -1,13 +1,44 @@
 # ai/agent.py
-import json
-import asyncio
+import re
 import os
+import asyncio
 import logging
-from typing import Dict, Any
-from mcp.server import LocalMCP, list_tools
-from dotenv import load_dotenv
+from typing import Dict, Any, List
+from mcp import LocalMCP, list_tools, load_tools
+from ai.jsonscan import JsonObjectScanner
+from dotenv import load_dotenv, find_dotenv
+
+# Search upwards for .env as load_dotenv() would, but skip loading when there is none (e.g. in containers)
+_dotenv_path = find_dotenv()
+if _dotenv_path:
+    load_dotenv(_dotenv_path)
+
+try:
+    import orjson
+
+    # Non-str keys are stringified like the stdlib does, instead of raising
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj, indent: bool = False, default=None) -> str:
+        option = _ORJSON_OPTS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTS
+        return orjson.dumps(obj, default=default, option=option).decode()
 
-load_dotenv()
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib produces the same compact JSON, just slower
+    import json
+
+    def _dumps(obj, indent: bool = False, default=None) -> str:
+        if indent:
+            return json.dumps(obj, default=default, ensure_ascii=False, indent=2)
+        return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"))
+
+    _loads = json.loads
+
+try:
+    import uvloop  # optional faster event loop; asyncio.run() in the CLI picks it up
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -17,9 +48,29 @@ logger = logging.getLogger(__name__)
 MAX_CONVERSATION_STEPS = int(os.getenv("MAX_CONVERSATION_STEPS", "6"))
 MAX_RESPONSE_LENGTH = 50000
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
-
-# Enhanced system prompt with YAML generation capability
-SYSTEM_PROMPT = """You are a Kubernetes SRE assistant that helps diagnose cluster issues, retrieve YAML manifests, and edit deployments.
+TOOL_RESULT_MAX_BYTES = int(os.getenv("TOOL_RESULT_MAX_BYTES", "4096"))
+TOOL_RESULT_MAX_ITEMS = 20
+# Only bulky diagnostic output is compacted. Manifests and listings are handed back to
+# the user (or patched from) as they are, so those results always reach the model whole
+_COMPACTED_TOOLS = frozenset({"get_pod_logs", "get_pod_details", "get_cluster_events"})
+
+# Fixed headings for formatted final responses
+_ANALYSIS_HEADING = "## 🔍 Analysis\n"
+_RECOMMENDATION_HEADING = "\n\n## 💡 Recommendation\n"
+_YAML_HEADING = "\n\n## 📄 Generated YAML\n```yaml\n"
+_KUBECTL_HEADING = "\n\n## 🔧 Suggested Command\n```bash\n"
+_POST_CHECKS_HEADING = "\n\n## ✅ Post-Checks"
+
+# Reply types keyed by how they appear near the start of a reply
+_REPLY_SENTINELS = {'"tool_call"': "tool_call", '"data_response"': "data_response", '"final_response"': "final_response"}
+
+# Leading ```json / ``` fence and trailing ``` fence around a model reply
+_FENCE_RE = re.compile(r"\A\s*```(?:json)?\s*|\s*```\s*\Z")
+# Reasoning blocks some models emit before the answer
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+# Protocol preamble sent on every step; kept byte-identical so provider prefix caches hit
+SYSTEM_CORE = """You are a Kubernetes SRE assistant that helps diagnose cluster issues, retrieve YAML manifests, and edit deployments.
 
 CRITICAL: You MUST respond with ONLY valid JSON. No markdown, no explanations, ONLY JSON.
 
@@ -36,6 +87,8 @@ Three response formats:
 
 Available tools: {tools}
 
+Tool results are sent back to you as the next user message: {{"tool": "...", "args": {{}}, "result": {{}}}}
+
 CRITICAL PARAMETER NAMES - Use these EXACT names when calling tools:
 - get_pod_logs: Use "pod_name" (accepts "pod" as alias)
 - get_pod_details: Use "pod_name" (accepts "pod" as alias)
@@ -43,6 +96,7 @@ CRITICAL PARAMETER NAMES - Use these EXACT names when calling tools:
 - check_pod_config_references: Use "pod_name" (accepts "pod" as alias)
 - test_dns_from_pod: Use "pod_name" (accepts "pod" as alias)
 - test_connectivity_from_pod: Use "source_pod" (accepts "pod" as alias)
+- test_connectivity_matrix: Use "source_pods" (list of pod names) and "targets" (list of "host:port")
 
 NEW YAML RETRIEVAL TOOLS:
 - get_deployment_yaml(deployment_name, namespace): Get ACTUAL deployment YAML from cluster
@@ -53,7 +107,15 @@ NEW EDITING TOOLS:
 - patch_deployment_command(deployment_name, container_name, new_command, namespace): Update container command
 - patch_deployment_replicas(deployment_name, replicas, namespace): Scale deployment
 
-ENHANCED TROUBLESHOOTING METHODOLOGY:
+PARALLEL READS:
+- batch_invoke(calls): Run independent read tools at once, e.g. {{"tool_call": {{"name": "batch_invoke", "args": {{"calls": [{{"name": "get_pods", "args": {{}}}}, {{"name": "get_services", "args": {{}}}}]}}}}}}
+- Prefer batch_invoke whenever you need more than one read whose arguments don't depend on each other
+- get_pods, get_deployments, get_services, get_persistent_volume_claims and get_resource_quotas accept namespace="all"; use it instead of one call per namespace
+
+Remember: ONLY output JSON, nothing else."""
+
+# Troubleshooting playbook, only sent while the agent picks its first tool
+PLAYBOOK = """ENHANCED TROUBLESHOOTING METHODOLOGY:
 
 **Step 1: Get Overview**
 - Use get_cluster_health_summary() first for high-level cluster status
@@ -81,6 +143,7 @@ D) CONFIGURATION ISSUES (ConfigMap/Secret not found):
    1. get_configmaps() → verify ConfigMap exists
    2. get_secrets() → verify Secret exists (shows keys only)
    3. check_pod_config_references(pod_name="...", namespace="...") → find which configs are missing
+   4. find_pods_using_config(name="...", kind="configmap"|"secret", namespace="...") → which pods a change would affect
 
 E) SCHEDULING/RESOURCE ISSUES (pod pending, nodes full):
    1. get_node_details() → check node capacity and conditions
@@ -106,8 +169,8 @@ When user asks to "list pod names" or "show me the pods" or "what are the pod na
 
 Example:
 User: "list pod names from kube-system"
-Step 1: {{"tool_call": {{"name": "get_pods", "args": {{"namespace": "kube-system"}}}}}}
-Step 2: {{"data_response": {{"summary": "Found 12 pods in kube-system namespace", "items": ["coredns-1234", "kube-proxy-5678", ...], "format": "list"}}}}
+Step 1: {"tool_call": {"name": "get_pods", "args": {"namespace": "kube-system"}}}
+Step 2: {"data_response": {"summary": "Found 12 pods in kube-system namespace", "items": ["coredns-1234", "kube-proxy-5678", ...], "format": "list"}}
 
 **FIXING CRASHING PODS:**
 When user asks to fix a crashing pod:
@@ -123,52 +186,79 @@ Step 1: get_pod_logs(pod_name="crash-demo-xxx", namespace="default")
 Step 2: get_deployment_yaml(deployment_name="crash-demo", namespace="default")
 Step 3: Identify bad command: ["nonexistent-command"]
 Step 4: patch_deployment_command(deployment_name="crash-demo", container_name="crash-container", new_command=["sh", "-c", "sleep 3600"], namespace="default")
-Step 5: {{"final_response": {{"analysis": "Found issue: command 'nonexistent-command' does not exist", "recommendation": "Updated command to 'sleep 3600' - pods will restart automatically", "kubectl": "kubectl get pods -n default -w", "confidence": 0.95, "post_checks": ["Wait for new pods to become Ready", "Check logs: kubectl logs <new-pod>"]}}}}
+Step 5: {"final_response": {"analysis": "Found issue: command 'nonexistent-command' does not exist", "recommendation": "Updated command to 'sleep 3600' - pods will restart automatically", "kubectl": "kubectl get pods -n default -w", "confidence": 0.95, "post_checks": ["Wait for new pods to become Ready", "Check logs: kubectl logs <new-pod>"]}}
 
 **kubectl Command Guidelines:**
 - Include namespace: -n <namespace>
 - Prefer diagnostic commands: describe, logs, get, top
 - Avoid destructive: delete, apply (except for generated YAML)
-- Format for copy-paste: single line, executable
-
-Remember: ONLY output JSON, nothing else."""
+- Format for copy-paste: single line, executable"""
 
 mcp_client = LocalMCP()
 
 
+def _compact(value, max_bytes: int):
+    if isinstance(value, dict):
+        return {k: _compact(v, max_bytes) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [_compact(v, max_bytes) for v in value[:TOOL_RESULT_MAX_ITEMS]]
+        if len(value) > TOOL_RESULT_MAX_ITEMS:
+            head.append(f"...({len(value) - TOOL_RESULT_MAX_ITEMS} more)")
+        return head
+    if isinstance(value, str) and len(value) > max_bytes:
+        # Keep both ends: describe-style output leads with the object's identity and
+        # status, while logs end with the newest (usually most interesting) lines
+        half = max_bytes // 2
+        return f"{value[:half]}\n...({len(value) - 2 * half} chars omitted)...\n{value[-half:]}"
+    return value
+
+
+def _summarize_tool_result(tool_name: str, result: Any, max_bytes: int = TOOL_RESULT_MAX_BYTES) -> Any:
+    """Return a prompt-sized version of a tool result.
+
+    Only results of _COMPACTED_TOOLS are shrunk. Those that serialize to more than
+    max_bytes keep all their fields, but lists are cut to the first
+    TOOL_RESULT_MAX_ITEMS items and long strings to their first and last
+    max_bytes / 2 characters.
+    """
+    if tool_name not in _COMPACTED_TOOLS:
+        return result
+    try:
+        size = len(_dumps(result, default=str))
+    except TypeError:
+        return result
+    if size <= max_bytes:
+        return result
+    
+    if DEBUG:
+        logger.debug(f"[DEBUG] Compacting {tool_name} result ({size} bytes)")
+    return _compact(result, max_bytes)
+
+
 class AIAgent:
     def __init__(self, adapter):
         self.adapter = adapter
+        load_tools()
         self.tools = list_tools()
-    
-    def _get_system_prompt(self):
-        tools_str = ", ".join(self.tools.keys())
-        return SYSTEM_PROMPT.format(tools=tools_str)
-    
-    def _invoke_tool_sync(self, name: str, args: Dict[str, Any]):
-        """Synchronous wrapper for tool invocation"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(mcp_client.invoke(name, args))
-            return result
-        finally:
-            loop.close()
+        # Tool set is fixed for the agent's lifetime, so the prompt is too
+        self._tool_names_list = list(self.tools.keys())
+        self._system_prompt = SYSTEM_CORE.format(tools=", ".join(self._tool_names_list))
+        self._playbook_msg = {"role": "system", "content": PLAYBOOK}
     
     def _clean_json_response(self, reply: str) -> str:
         """Clean up AI response to extract valid JSON"""
-        reply = reply.strip()
-        
-        # Remove markdown code blocks
-        if reply.startswith("```json"):
-            reply = reply[7:]
-        elif reply.startswith("```"):
-            reply = reply[3:]
+        text = reply.strip()
+        if text.startswith("{") and text.endswith("}"):
+            return text
         
-        if reply.endswith("```"):
-            reply = reply[:-3]
-        
-        return reply.strip()
+        # Fences, preambles or trailing chatter: cut out the first complete top-level object
+        if "<think>" in text:
+            text = _THINK_RE.sub("", text)
+        scanner = JsonObjectScanner()
+        end = scanner.feed(text)
+        if end > 0:
+            return text[scanner.start:end]
+        return _FENCE_RE.sub("", text).strip()
     
     def _handle_tool_error(self, tool_name: str, tool_args: Dict[str, Any], error: Exception, conversation_context: list) -> Dict[str, Any]:
         """Handle tool invocation errors and provide recovery hints"""
@@ -201,45 +291,68 @@ class AIAgent:
     
     def _format_data_response(self, resp: Dict[str, Any]) -> str:
         """Format data_response (for listing items)"""
-        output = []
-        
-        if resp.get("summary"):
-            output.append(f"## 📋 {resp['summary']}")
-            output.append("")
+        header = f"## 📋 {resp['summary']}\n" if resp.get("summary") else ""
         
         items = resp.get("items", [])
-        if items:
-            if resp.get("format") == "list":
-                # Simple list format
-                for item in items:
-                    output.append(f"- {item}")
-            elif resp.get("format") == "table":
-                # Table format (if items are dicts)
-                for item in items:
-                    if isinstance(item, dict):
-                        for key, value in item.items():
-                            output.append(f"**{key}**: {value}")
-                        output.append("")
-            else:
-                # Default: just list items
-                for item in items:
-                    output.append(f"- {item}")
+        if not items:
+            body = ""
+        elif resp.get("format") == "table":
+            # Table format (if items are dicts): one "**key**: value" block per item
+            body = "\n".join(
+                "".join(f"**{key}**: {value}\n" for key, value in item.items())
+                for item in items if isinstance(item, dict)
+            )
+        else:
+            # List format (also the default)
+            body = "\n".join(f"- {item}" for item in items)
         
-        return "\n".join(output)
+        if header and body:
+            return f"{header}\n{body}"
+        return header or body
     
-    def process_input(self, user_question: str, max_steps: int = MAX_CONVERSATION_STEPS):
+    def _format_final_response(self, resp: Dict[str, Any]) -> str:
+        """Format final_response as markdown"""
+        parts = [
+            f"{_ANALYSIS_HEADING}{resp.get('analysis', 'N/A')}"
+            f"{_RECOMMENDATION_HEADING}{resp.get('recommendation', 'N/A')}"
+        ]
+        
+        # Handle YAML output if present (unescaping literal \n sequences)
+        if resp.get("yaml"):
+            parts += (_YAML_HEADING, resp["yaml"].replace("\\n", "\n"), "\n```")
+        
+        if resp.get("kubectl"):
+            parts += (_KUBECTL_HEADING, resp["kubectl"], "\n```")
+        
+        if resp.get("post_checks"):
+            parts.append(_POST_CHECKS_HEADING)
+            parts.extend(f"\n- {check}" for check in resp["post_checks"])
+        
+        parts.append(f"\n\n*Confidence: {resp.get('confidence', 0.0):.0%}*")
+        return "".join(parts)
+    
+    async def process_input(self, user_question: str, max_steps: int = MAX_CONVERSATION_STEPS):
         """Main dialog loop with the AI agent"""
         conversation_context = []
-        user_msg = json.dumps({"user_question": user_question})
+        # Append-only message list: the system prompt, the question and earlier
+        # turns stay byte-identical across steps so provider prefix caches hit
+        messages = [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": _dumps({"user_question": user_question})},
+        ]
         
         for step in range(max_steps):
             if DEBUG:
                 logger.debug(f"\n[DEBUG] Step {step + 1}/{max_steps}")
-                logger.debug(f"[DEBUG] Sending to AI: {user_msg[:200]}...")
+                logger.debug(f"[DEBUG] Sending to AI: {messages[-1]['content'][:200]}...")
             
             # Get AI response
             try:
-                reply = self.adapter.chat(self._get_system_prompt(), user_msg)
+                # Playbook rides along on the first step only; later steps send just the core prompt
+                if step == 0:
+                    reply = await self.adapter.chat([messages[0], self._playbook_msg] + messages[1:])
+                else:
+                    reply = await self.adapter.chat(messages)
             except Exception as e:
                 logger.error(f"AI adapter error: {e}")
                 return f"❌ Error: Failed to get AI response: {e}"
@@ -247,16 +360,25 @@ class AIAgent:
             if DEBUG:
                 logger.debug(f"[DEBUG] AI raw response: {reply}")
             
-            # Clean up response
-            reply = self._clean_json_response(reply)
+            # Bytes replies are already compact JSON (LocalAdapter); only text needs cleanup
+            if isinstance(reply, bytes):
+                head = reply[:64].decode(errors="ignore")
+            else:
+                reply = self._clean_json_response(reply)
+                head = reply[:64]
+                
+                if DEBUG:
+                    logger.debug(f"[DEBUG] AI cleaned response: {reply}")
             
-            if DEBUG:
-                logger.debug(f"[DEBUG] AI cleaned response: {reply}")
+            # Every reply is a single-key object, so its type shows up in the first bytes
+            kind = next((k for sentinel, k in _REPLY_SENTINELS.items() if sentinel in head), None)
             
             # Parse JSON
             try:
-                parsed = json.loads(reply)
-            except json.JSONDecodeError as e:
+                if not head.startswith("{"):
+                    raise ValueError("reply is not a JSON object")
+                parsed = _loads(reply)
+            except ValueError as e:  # both orjson and json decode errors are ValueErrors
                 logger.error(f"JSON decode error: {e}")
                 logger.error(f"Raw response: {reply}")
                 
@@ -269,8 +391,14 @@ class AIAgent:
                 error_msg += f"Error: {e}"
                 return error_msg
             
+            if not isinstance(parsed, dict):
+                kind = None
+            elif kind not in parsed:
+                # Sniff missed (e.g. long leading whitespace); fall back to the parsed keys
+                kind = next((k for k in _REPLY_SENTINELS.values() if k in parsed), None)
+            
             # Check if this is a tool call
-            if "tool_call" in parsed:
+            if kind == "tool_call":
                 tool_info = parsed["tool_call"]
                 tool_name = tool_info.get("name")
                 tool_args = tool_info.get("args", {})
@@ -279,18 +407,19 @@ class AIAgent:
                     logger.debug(f"[DEBUG] Tool call: {tool_name} with args {tool_args}")
                 
                 if tool_name not in self.tools:
-                    return f"❌ Error: AI requested unknown tool '{tool_name}'. Available: {list(self.tools.keys())}"
+                    return f"❌ Error: AI requested unknown tool '{tool_name}'. Available: {self._tool_names_list}"
                 
                 # Invoke the tool
                 try:
-                    result = self._invoke_tool_sync(tool_name, tool_args)
+                    result = await mcp_client.invoke(tool_name, tool_args)
                     if DEBUG:
                         logger.debug(f"[DEBUG] Tool result: {str(result)[:200]}...")
                     
+                    # The model sees a compacted copy of large results
                     conversation_context.append({
                         "tool": tool_name,
                         "args": tool_args,
-                        "result": result
+                        "result": _summarize_tool_result(tool_name, result)
                     })
                     
                 except Exception as e:
@@ -301,54 +430,42 @@ class AIAgent:
                     if DEBUG:
                         logger.debug(f"[DEBUG] Tool error handled, allowing AI to retry")
                 
-                # Update user message with conversation history
-                user_msg = json.dumps({
-                    "user_question": user_question,
-                    "conversation": conversation_context
-                })
+                # Append only the new turn; the newest tool entry is serialized once
+                if isinstance(reply, bytes):
+                    reply = reply.decode()
+                messages.append({"role": "assistant", "content": reply})
+                messages.append({"role": "user", "content": _dumps(conversation_context[-1], default=str)})
             
             # Check if this is a data response (for listing items)
-            elif "data_response" in parsed:
+            elif kind == "data_response":
                 resp = parsed["data_response"]
                 return self._format_data_response(resp)
             
             # Check if this is a final response
-            elif "final_response" in parsed:
+            elif kind == "final_response":
                 resp = parsed["final_response"]
                 
                 if DEBUG:
                     logger.debug(f"[DEBUG] Final response received")
                 
-                # Format the response nicely
-                output = []
-                output.append("## 🔍 Analysis")
-                output.append(resp.get("analysis", "N/A"))
-                output.append("\n## 💡 Recommendation")
-                output.append(resp.get("recommendation", "N/A"))
-                
-                # Handle YAML output if present
-                if resp.get("yaml"):
-                    output.append("\n## 📄 Generated YAML")
-                    yaml_content = resp.get("yaml", "")
-                    # Unescape newlines
-                    yaml_content = yaml_content.replace("\\n", "\n")
-                    output.append(f"```yaml\n{yaml_content}\n```")
-                
-                if resp.get("kubectl"):
-                    output.append("\n## 🔧 Suggested Command")
-                    output.append(f"```bash\n{resp.get('kubectl')}\n```")
-                
-                if resp.get("post_checks"):
-                    output.append("\n## ✅ Post-Checks")
-                    for check in resp["post_checks"]:
-                        output.append(f"- {check}")
-                
-                output.append(f"\n*Confidence: {resp.get('confidence', 0.0):.0%}*")
-                
-                return "\n".join(output)
+                return self._format_final_response(resp)
             
             else:
                 logger.error(f"Unexpected response format: {parsed}")
-                return f"❌ Error: AI returned unexpected format:\n{json.dumps(parsed, indent=2)}"
+                return f"❌ Error: AI returned unexpected format:\n{_dumps(parsed, indent=True)}"
+        
+        return f"❌ Error: Reached maximum conversation steps ({max_steps}) without a final response. The AI may be stuck in a loop or the problem is too complex for the current configuration."
+    
+    async def process_batch(self, questions: List[str], concurrency: int = 8) -> List[Any]:
+        """Answer several questions concurrently, at most `concurrency` at a time.
+        
+        Results come back in input order; a question that raised yields its
+        exception instead of a string.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def one(question):
+            async with sem:
+                return await self.process_input(question)
         
-        return f"❌ Error: Reached maximum conversation steps ({max_steps}) without a final response. The AI may be stuck in a loop or the problem is too complex for the current configuration."
\ No newline at end of file
+        return await asyncio.gather(*(one(q) for q in questions), return_exceptions=True)
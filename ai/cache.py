@@ -0,0 +1,172 @@
+# ai/cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # only needed for the optional semantic cache
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+LLM_CACHE_DISABLE = os.getenv("LLM_CACHE_DISABLE", "false").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path.home() / ".cache" / "kubesensei" / "llm_cache.sqlite3"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_SEMANTIC_CACHE = os.getenv("LLM_SEMANTIC_CACHE", "0") == "1"
+LLM_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+LLM_EMBEDDING_MODEL = os.getenv("LLM_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+def cache_key(model: str, messages: list, max_tokens: int, temperature: float) -> str:
+    """SHA-256 over every request parameter that influences the completion."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match completion cache backed by SQLite with TTL and LRU eviction"""
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return the cached content for key, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return content
+
+    def set(self, key: str, content: str, model: str = None):
+        """Store content under key, evicting least-recently-used rows beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SemanticCache:
+    """In-memory cosine-similarity cache over embeddings of the user question.
+
+    Entries are partitioned by scope (model + system prompt + sampling params) so
+    a hit can only replay a completion produced under identical conditions.
+    """
+    def __init__(self, threshold: float = LLM_SEMANTIC_CACHE_THRESHOLD, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._scopes = {}  # scope -> OrderedDict[user, (unit vector, content)]
+        self._matrices = {}  # scope -> (stacked unit vectors, contents), rebuilt lazily
+        self._lock = threading.Lock()
+
+    def get(self, scope: str, vector):
+        """Return (content, matched_user) for the most similar entry above threshold, else None."""
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if not entries:
+                return None
+            if scope not in self._matrices:
+                users = list(entries)
+                self._matrices[scope] = (np.vstack([entries[u][0] for u in users]), users)
+            matrix, users = self._matrices[scope]
+
+            scores = matrix @ _normalize(vector)
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                return None
+
+            user = users[best]
+            entries.move_to_end(user)
+            return entries[user][1], user
+
+    def set(self, scope: str, vector, user: str, content: str):
+        with self._lock:
+            entries = self._scopes.setdefault(scope, OrderedDict())
+            entries[user] = (_normalize(vector), content)
+            entries.move_to_end(user)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._matrices.pop(scope, None)
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _open_semantic_cache():
+    if not LLM_SEMANTIC_CACHE or LLM_CACHE_DISABLE:
+        return None
+    if np is None:
+        logger.warning("LLM_SEMANTIC_CACHE=1 requires numpy; semantic cache disabled")
+        return None
+    return SemanticCache()
+
+
+def _open_default_cache():
+    if LLM_CACHE_DISABLE:
+        return None
+    try:
+        return ResponseCache()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"LLM response cache unavailable: {e}")
+        return None
+
+
+# Shared across adapter instances; None when caching is disabled
+response_cache = _open_default_cache()
+semantic_cache = _open_semantic_cache()
@@ -0,0 +1,41 @@
+# ai/jsonscan.py
+
+
+class JsonObjectScanner:
+    """Incrementally finds where the first top-level JSON object in a text ends.
+
+    Tracks brace depth while skipping over string literals (and escapes inside
+    them), so braces in values like "{not a brace}" are ignored. Text before the
+    first "{" (e.g. a markdown fence) is skipped.
+    """
+    def __init__(self):
+        self.start = -1
+        self.pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> int:
+        """Consume the next chunk; return the offset just past the closing brace, or -1."""
+        for ch in text:
+            self.pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == "{":
+                if self.start < 0:
+                    self.start = self.pos - 1
+                self._depth += 1
+            elif self.start < 0:
+                continue
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    return self.pos
+        return -1
@@ -0,0 +1,37 @@
+# ai/ratelimit.py
+import time
+import asyncio
+
+
+class AsyncLimiter:
+    """Token-bucket limiter allowing `rate` acquisitions per `period` seconds.
+
+    Usable as `async with limiter:`; bursts up to `rate` are allowed, after which
+    callers wait for tokens to refill.
+    """
+    def __init__(self, rate: float, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate / self.period)
+        self._last = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
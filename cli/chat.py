@@ -1,5 +1,6 @@
 # cli/chat.py
 import sys
+import asyncio
 from pathlib import Path
 
 # Add project root to Python path
@@ -10,15 +11,12 @@ from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.syntax import Syntax
-from ai.agent import AIAgent
-from ai.adapters import OpenAIAdapter, OpenRouterAdapter, LocalAdapter
-from dotenv import load_dotenv
-import os
+from ai.agent import AIAgent  # loads .env before the adapters read their settings
+from ai.adapters import OpenAIAdapter, OpenRouterAdapter, LocalAdapter, LLM_PROVIDER, OPENROUTER_MODEL
 
 console = Console()
-load_dotenv()
 
-def terminal_chat():
+async def terminal_chat():
     console.print(Panel.fit(
         "🤖 KubeSensei - Kubernetes AI Assistant\n"
         "💡 Ask for troubleshooting OR YAML generation\n"
@@ -27,7 +25,7 @@ def terminal_chat():
     ))
 
     # Choose adapter based on env var
-    provider = os.getenv("LLM_PROVIDER", "local").lower()
+    provider = LLM_PROVIDER
     
     # Debug output
     print(f"🔧 Using provider: {provider}")
@@ -35,7 +33,7 @@ def terminal_chat():
     if provider == "openai":
         adapter = OpenAIAdapter()
     elif provider == "openrouter":
-        model = os.getenv("OPENROUTER_MODEL", "openai/gpt-3.5-turbo")
+        model = OPENROUTER_MODEL
         print(f"🌐 OpenRouter model: {model}")
         adapter = OpenRouterAdapter(model=model)
     else:
@@ -51,23 +49,27 @@ def terminal_chat():
     console.print("[dim]  • Create deployment YAML for nginx with 3 replicas[/dim]")
     console.print("[dim]  • Show me YAML for ClusterRole with pod read permissions[/dim]\n")
 
-    while True:
-        user_input = console.input("[bold green]You:[/] ").strip()
-        
-        if user_input.lower() in ["exit", "quit", "q"]:
-            console.print("👋 Goodbye!")
-            break
-        
-        if not user_input:
-            continue
+    try:
+        while True:
+            user_input = console.input("[bold green]You:[/] ").strip()
+            
+            if user_input.lower() in ["exit", "quit", "q"]:
+                console.print("👋 Goodbye!")
+                break
+            
+            if not user_input:
+                continue
 
-        with console.status("[bold yellow]AI is thinking..."):
-            response = agent.process_input(user_input)
+            with console.status("[bold yellow]AI is thinking..."):
+                response = await agent.process_input(user_input)
 
-        console.print("\n[bold blue]AI:[/]")
-        console.print(Markdown(response))
-        console.print()  # Extra line for spacing
+            console.print("\n[bold blue]AI:[/]")
+            console.print(Markdown(response))
+            console.print()  # Extra line for spacing
+    finally:
+        await adapter.aclose()
 
 
 if __name__ == "__main__":
-    terminal_chat()
\ No newline at end of file
+    # Single event loop for the whole session so pooled connections are reused
+    asyncio.run(terminal_chat())
\ No newline at end of file
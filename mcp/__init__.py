@@ -1,6 +1,23 @@
 # mcp/__init__.py
-from .server import LocalMCP, tool, list_tools, invoke_local
-from .tools import *  # Basic tools (6 tools)
-from .tools_enhanced import *  # Enhanced tools (15 additional tools)
+import importlib
+from .server import LocalMCP, tool, list_tools, invoke_local, invoke_batch
 
-__all__ = ["LocalMCP", "tool", "list_tools", "invoke_local"]
\ No newline at end of file
+# Tool modules pull in the kubernetes client, so they are imported on first use.
+# Later modules win on duplicate names, as with the former star imports.
+_TOOL_MODULES = (".tools", ".tools_enhanced")  # Basic tools, then enhanced tools
+
+
+def load_tools():
+    """Import the tool modules, registering their @tool functions (idempotent)."""
+    return [importlib.import_module(mod, __name__) for mod in _TOOL_MODULES]
+
+
+def __getattr__(name):
+    # PEP 562: resolve tool functions (e.g. mcp.get_pods) lazily
+    for module in reversed(load_tools()):
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["LocalMCP", "tool", "list_tools", "load_tools", "invoke_local", "invoke_batch"]
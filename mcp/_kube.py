@@ -0,0 +1,119 @@
+# mcp/_kube.py
+# Kubernetes client plumbing shared by the tool modules: config loading, one pooled
+# ApiClient behind every typed API, and the executor/semaphore that tools await calls through.
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from kubernetes import client, config
+from urllib3.util.retry import Retry
+
+
+# Worker threads for blocking client calls
+_EXECUTOR_WORKERS = 8
+
+# urllib3 pool size of the shared ApiClient; kept well above the executor size so
+# pooled connections are reused instead of being discarded and re-opened
+_POOL_MAXSIZE = 32
+
+# Retries for connection errors and idempotent requests, e.g. a pooled keep-alive
+# connection the apiserver closed; urllib3 never replays POST/PATCH on a read error
+_RETRIES = Retry(total=3, backoff_factor=0.1)
+
+
+# Kubernetes clients are built on first use, so importing the tools does no config I/O
+@lru_cache(maxsize=None)
+def _ensure_config():
+    """Load kubeconfig, falling back to in-cluster config; runs once."""
+    try:
+        config.load_kube_config()
+    except Exception:
+        # Fallback to in-cluster config if running inside k8s
+        try:
+            config.load_incluster_config()
+        except Exception:
+            print("Warning: Could not load Kubernetes config")
+
+
+@lru_cache(maxsize=None)
+def _configuration():
+    _ensure_config()
+    cfg = client.Configuration.get_default_copy()
+    cfg.connection_pool_maxsize = _POOL_MAXSIZE
+    cfg.retries = _RETRIES
+    return cfg
+
+
+@lru_cache(maxsize=None)
+def _api_client():
+    """The ApiClient (and connection pool) shared by every typed API below."""
+    return client.ApiClient(_configuration())
+
+
+@lru_cache(maxsize=None)
+def _core():
+    return client.CoreV1Api(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _apps():
+    return client.AppsV1Api(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _custom():
+    return client.CustomObjectsApi(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _networking():
+    return client.NetworkingV1Api(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _storage():
+    return client.StorageV1Api(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _rbac():
+    return client.RbacAuthorizationV1Api(_api_client())
+
+
+@lru_cache(maxsize=None)
+def _exec_core():
+    # stream() swaps out its client's request method while it runs, so exec gets its own ApiClient
+    return client.CoreV1Api(client.ApiClient(_configuration()))
+
+
+# The kubernetes client is blocking; run its calls on a bounded pool so tools don't stall the event loop
+_EXECUTOR = ThreadPoolExecutor(max_workers=_EXECUTOR_WORKERS, thread_name_prefix="k8s-io")
+
+# Max in-flight apiserver requests across all tools, so concurrent tool calls don't storm it into 429s
+MCP_K8S_CONCURRENCY = int(os.getenv("MCP_K8S_CONCURRENCY", "6"))
+_apiserver_sem = None
+
+
+def _get_apiserver_sem() -> asyncio.Semaphore:
+    """Return the apiserver semaphore, created inside the running loop."""
+    global _apiserver_sem
+    if _apiserver_sem is None:
+        _apiserver_sem = asyncio.Semaphore(MCP_K8S_CONCURRENCY)
+    return _apiserver_sem
+
+
+async def _call(fn, *args, **kwargs):
+    """Run a blocking client call on the k8s I/O pool and await its result."""
+    async with _get_apiserver_sem():
+        return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+# Exec sessions last as long as their command, so they run on their own workers and
+# outside the apiserver semaphore rather than holding slots short API calls need
+_EXEC_WORKERS = 8
+_EXEC_EXECUTOR = ThreadPoolExecutor(max_workers=_EXEC_WORKERS, thread_name_prefix="k8s-exec")
+
+
+async def _call_exec(fn, *args, **kwargs):
+    """Run a blocking exec session on the exec pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_EXEC_EXECUTOR, partial(fn, *args, **kwargs))
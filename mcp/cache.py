@@ -0,0 +1,98 @@
+# mcp/cache.py
+# Short-lived in-process cache for Kubernetes LIST responses, so an agent that
+# re-reads the same resources within a few seconds doesn't re-hit the API server.
+import os
+import time
+import asyncio
+import inspect
+import functools
+from typing import Any, Callable, Dict, Tuple
+
+MCP_CACHE_TTL = float(os.getenv("MCP_CACHE_TTL", "3"))  # seconds; 0 disables
+
+# Namespace values tools accept for "every namespace"
+ALL_NAMESPACES = ("all", "*")
+
+# ttl_cache tiers for read-only tools: state that flips during rollouts (endpoints,
+# quota usage) vs. objects that are edited by hand (PVs, ingresses, network policies)
+TTL_FAST = 5
+TTL_SLOW = 30
+
+# (kind, namespace, *extra) -> (expires_at, value)
+_CACHE: Dict[tuple, Tuple[float, Any]] = {}
+# key -> task computing it, so concurrent ttl_cache misses share one call
+_INFLIGHT: Dict[tuple, asyncio.Task] = {}
+# Expired entries are swept once the cache grows past this many keys
+_SWEEP_AT = 256
+
+
+def cached(key: tuple, fn: Callable[[], Any], ttl: float = MCP_CACHE_TTL):
+    """Return fn() memoized under key for ttl seconds.
+
+    Keys start with (kind, namespace) so invalidate() can drop them by prefix.
+    Exceptions are not cached.
+    """
+    if ttl <= 0:
+        return fn()
+    hit = _CACHE.get(key)
+    if hit is not None and time.monotonic() < hit[0]:
+        return hit[1]
+    value = fn()
+    now = time.monotonic()
+    if len(_CACHE) >= _SWEEP_AT:
+        for stale in [k for k, (expires_at, _) in list(_CACHE.items()) if expires_at <= now]:
+            _CACHE.pop(stale, None)
+    _CACHE[key] = (now + ttl, value)
+    return value
+
+
+def invalidate(kind: str = None, namespace: str = None):
+    """Drop cached entries for kind/namespace (None matches anything).
+    
+    Cluster-wide entries are dropped along with any namespace, since they include it.
+    """
+    for key in list(_CACHE):
+        if (kind is None or key[0] == kind) and (namespace is None or key[1] == namespace or key[1] in ALL_NAMESPACES):
+            _CACHE.pop(key, None)
+
+
+def ttl_cache(kind: str, ttl: float = MCP_CACHE_TTL):
+    """Decorator memoizing an async tool's result for ttl seconds.
+
+    Entries share the cache above, keyed (kind, namespace, *other arguments), so
+    invalidate(kind, namespace) drops them too. **kwargs extras are ignored and
+    {"error": ...} results are not cached. Concurrent misses on one key await a
+    single call instead of each hitting the API server.
+    """
+    def _decorator(fn: Callable):
+        sig = inspect.signature(fn)
+        var_kw = [n for n, p in sig.parameters.items() if p.kind is inspect.Parameter.VAR_KEYWORD]
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            for name in var_kw:
+                params.pop(name, None)
+            namespace = params.pop("namespace", None)
+            key = (kind, namespace, *sorted(params.items()))
+
+            hit = _CACHE.get(key)
+            if hit is not None and time.monotonic() < hit[0]:
+                return hit[1]
+            
+            task = _INFLIGHT.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = _INFLIGHT[key] = asyncio.ensure_future(_fill(key, fn(*args, **kwargs)))
+                task.add_done_callback(lambda done: _INFLIGHT.pop(key, None) if _INFLIGHT.get(key) is done else None)
+            # Shielded so one caller giving up doesn't cancel the call the others are waiting on
+            return await asyncio.shield(task)
+        
+        async def _fill(key, call):
+            result = await call
+            if ttl > 0 and not (isinstance(result, dict) and "error" in result):
+                _CACHE[key] = (time.monotonic() + ttl, result)
+            return result
+        return wrapper
+    return _decorator
@@ -0,0 +1,216 @@
+# mcp/informer.py
+# Watch-fed in-memory copy of cluster-wide nodes, pods, events and RBAC bindings, so
+# repeated health summaries and permission checks read local dicts instead of re-LISTing.
+import os
+import time
+import logging
+import threading
+from kubernetes import watch
+from mcp._kube import _core, _rbac
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: the cache holds every pod in memory, which only pays off in a long-lived process
+MCP_INFORMER = os.getenv("MCP_INFORMER", "0") == "1"
+# Each watch ends after this many seconds and is followed by a full re-list, which
+# reconciles anything a dropped or expired watch missed
+MCP_INFORMER_RESYNC = int(os.getenv("MCP_INFORMER_RESYNC", "60"))
+
+# Back-off after a failed list/watch before trying again
+_RETRY_DELAY = 5
+
+
+def _key(obj):
+    return (obj.metadata.namespace, obj.metadata.name)
+
+
+def ready_nodes(nodes) -> frozenset:
+    """Names of the nodes whose Ready condition is True."""
+    return frozenset(
+        n.metadata.name for n in nodes
+        if any(c.type == "Ready" and c.status == "True" for c in (n.status.conditions or ()))
+    )
+
+
+def build_sa_index(role_bindings, cluster_role_bindings) -> dict:
+    """Map (namespace, service_account) to the roles bound to it, in one pass over the subjects."""
+    index = {}
+    for rb in role_bindings:
+        for subject in (rb.subjects or ()):
+            if subject.kind == "ServiceAccount":
+                index.setdefault((subject.namespace or rb.metadata.namespace, subject.name), []).append({
+                    "type": "Role",
+                    "name": rb.role_ref.name,
+                    "namespace": rb.metadata.namespace
+                })
+    for crb in cluster_role_bindings:
+        for subject in (crb.subjects or ()):
+            if subject.kind == "ServiceAccount":
+                index.setdefault((subject.namespace, subject.name), []).append({
+                    "type": "ClusterRole",
+                    "name": crb.role_ref.name,
+                    "scope": "cluster-wide"
+                })
+    return index
+
+
+def pod_config_refs(spec) -> tuple:
+    """(ConfigMap names, Secret names) a pod spec references through volumes and envFrom."""
+    cms = set()
+    secrets = set()
+    add_cm = cms.add
+    add_secret = secrets.add
+    for volume in (spec.volumes or ()):
+        if volume.config_map:
+            add_cm(volume.config_map.name)
+        if volume.secret:
+            add_secret(volume.secret.secret_name)
+    for container in (spec.containers or ()):
+        for env_from in (container.env_from or ()):
+            if env_from.config_map_ref:
+                add_cm(env_from.config_map_ref.name)
+            if env_from.secret_ref:
+                add_secret(env_from.secret_ref.name)
+    return cms, secrets
+
+
+def build_config_ref_index(pods) -> dict:
+    """Map ("configmap" | "secret", namespace, name) to the names of the pods referencing it."""
+    index = {}
+    for pod in pods:
+        namespace = pod.metadata.namespace
+        cms, secrets = pod_config_refs(pod.spec)
+        for name in cms:
+            index.setdefault(("configmap", namespace, name), []).append(pod.metadata.name)
+        for name in secrets:
+            index.setdefault(("secret", namespace, name), []).append(pod.metadata.name)
+    return index
+
+
+class ClusterCache:
+    """Cluster-wide objects kept current by one list+watch thread per kind.
+
+    Stores are keyed by (namespace, name) and only mutated under the lock;
+    read them through snapshot() or the derived lookups, which are rebuilt
+    lazily after the kinds they depend on change.
+    """
+    KINDS = ("nodes", "pods", "events", "role_bindings", "cluster_role_bindings")
+    # derived value -> kinds whose changes invalidate it
+    _DERIVED = {
+        "sa_index": ("role_bindings", "cluster_role_bindings"),
+        "ready_nodes": ("nodes",),
+        "config_refs": ("pods",),
+    }
+
+    def __init__(self, resync: int = MCP_INFORMER_RESYNC):
+        self.resync = resync
+        self.nodes = {}
+        self.pods = {}
+        self.events = {}
+        self.role_bindings = {}
+        self.cluster_role_bindings = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+        self._synced = {kind: threading.Event() for kind in self.KINDS}
+        self._started = False
+
+    def start(self):
+        """Start the watch threads (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        core = _core()
+        rbac = _rbac()
+        list_fns = {
+            "nodes": core.list_node,
+            "pods": core.list_pod_for_all_namespaces,
+            "events": core.list_event_for_all_namespaces,
+            "role_bindings": rbac.list_role_binding_for_all_namespaces,
+            "cluster_role_bindings": rbac.list_cluster_role_binding,
+        }
+        for kind in self.KINDS:
+            threading.Thread(
+                target=self._run, args=(kind, list_fns[kind]), name=f"informer-{kind}", daemon=True
+            ).start()
+
+    def is_synced(self, *kinds) -> bool:
+        """True once every given kind (default: all) has completed its first full list."""
+        return all(self._synced[kind].is_set() for kind in (kinds or self.KINDS))
+
+    def snapshot(self):
+        """Return (nodes, pods, events) as lists, consistent with each other."""
+        with self._lock:
+            return list(self.nodes.values()), list(self.pods.values()), list(self.events.values())
+
+    def ready_nodes(self) -> frozenset:
+        """Names of Ready nodes, recomputed only after a node changes."""
+        with self._lock:
+            ready = self._derived.get("ready_nodes")
+            if ready is None:
+                ready = self._derived["ready_nodes"] = ready_nodes(self.nodes.values())
+            return ready
+
+    def service_account_bindings(self, namespace: str, service_account: str) -> list:
+        """Roles bound to a ServiceAccount, via an inverse index over all (Cluster)RoleBindings."""
+        with self._lock:
+            index = self._derived.get("sa_index")
+            if index is None:
+                index = build_sa_index(self.role_bindings.values(), self.cluster_role_bindings.values())
+                self._derived["sa_index"] = index
+            return list(index.get((namespace, service_account), ()))
+
+    def pods_referencing(self, kind: str, namespace: str, name: str) -> list:
+        """Names of the pods referencing a ConfigMap or Secret (kind "configmap"/"secret")."""
+        with self._lock:
+            index = self._derived.get("config_refs")
+            if index is None:
+                index = self._derived["config_refs"] = build_config_ref_index(self.pods.values())
+            return list(index.get((kind, namespace, name), ()))
+
+    def _changed(self, kind: str):
+        for name, sources in self._DERIVED.items():
+            if kind in sources:
+                self._derived.pop(name, None)
+
+    def _run(self, kind: str, list_fn):
+        store = getattr(self, kind)
+        while True:
+            try:
+                # resourceVersion=0 lets the apiserver serve the (re-)list from its watch cache
+                resp = list_fn(resource_version="0")
+                with self._lock:
+                    store.clear()
+                    store.update((_key(obj), obj) for obj in resp.items)
+                    self._changed(kind)
+                self._synced[kind].set()
+
+                stream = watch.Watch().stream(
+                    list_fn, resource_version=resp.metadata.resource_version, timeout_seconds=self.resync
+                )
+                for event in stream:
+                    obj = event["object"]
+                    with self._lock:
+                        if event["type"] == "DELETED":
+                            store.pop(_key(obj), None)
+                        elif event["type"] in ("ADDED", "MODIFIED"):
+                            store[_key(obj)] = obj
+                        self._changed(kind)
+            except Exception as e:
+                # Includes 410 Gone for an expired resourceVersion; the re-list recovers
+                logger.warning(f"informer {kind} watch failed, re-listing: {e}")
+                time.sleep(_RETRY_DELAY)
+
+
+_cluster_cache = None
+
+
+def get_cluster_cache():
+    """Return the started shared ClusterCache, or None when MCP_INFORMER is off."""
+    global _cluster_cache
+    if not MCP_INFORMER:
+        return None
+    if _cluster_cache is None:
+        _cluster_cache = ClusterCache()
+        _cluster_cache.start()
+    return _cluster_cache
@@ -1,12 +1,22 @@
 # mcp/server.py
 import inspect
 import asyncio
-from typing import Callable, Dict, Any
+import functools
+from typing import Callable, Dict, Any, List, Tuple
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 import uvicorn
 
+try:
+    import orjson  # noqa: F401 (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    ORJSONResponse = None
+
 # Tool registry (module-level)
 _TOOL_REGISTRY: Dict[str, Callable] = {}
+# Tool metadata, computed once at registration (tools are only ever added)
+_TOOL_META: Dict[str, Dict[str, Any]] = {}
 
 
 def tool(name: str = None):
@@ -14,17 +24,16 @@ def tool(name: str = None):
     def _decorator(fn: Callable):
         key = name or fn.__name__
         _TOOL_REGISTRY[key] = fn
+        _TOOL_META[key] = {
+            "args": list(inspect.signature(fn).parameters.keys()),
+            "doc": (fn.__doc__ or "")[:400]
+        }
         return fn
     return _decorator
 
 
 def list_tools():
-    return {
-        name: {
-            "args": list(inspect.signature(fn).parameters.keys()),
-            "doc": (fn.__doc__ or "")[:400]
-        } for name, fn in _TOOL_REGISTRY.items()
-    }
+    return _TOOL_META
 
 
 async def invoke_local(tool_name: str, payload: Dict[str, Any]):
@@ -35,8 +44,35 @@ async def invoke_local(tool_name: str, payload: Dict[str, Any]):
     if inspect.iscoroutinefunction(fn):
         return await fn(**payload)
     else:
+        # run_in_executor doesn't copy contextvars, so a bare partial is all the hop costs
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: fn(**payload))
+        return await loop.run_in_executor(None, functools.partial(fn, **payload))
+
+
+async def invoke_batch(calls: List[Tuple[str, Dict[str, Any]]]):
+    """Invoke several tools concurrently; a failed call yields {"error": ...} in its slot."""
+    results = await asyncio.gather(*(invoke_local(name, args) for name, args in calls), return_exceptions=True)
+    return [{"error": str(r) or type(r).__name__} if isinstance(r, Exception) else r for r in results]
+
+
+@tool()
+async def batch_invoke(calls: list = None, **kwargs):
+    """Run several independent tool calls at once and return all their results.
+    
+    Args:
+        calls: List of {"name": TOOL_NAME, "args": {...}} objects
+    """
+    pairs = [(c.get("name"), c.get("args") or {}) for c in (calls or [])]
+    if not pairs:
+        return {"error": "calls must be a non-empty list of {\"name\": ..., \"args\": {...}}"}
+    if any(name == "batch_invoke" for name, _ in pairs):
+        return {"error": "batch_invoke cannot be nested"}
+    
+    results = await invoke_batch(pairs)
+    return {"results": [
+        {"tool": name, "args": args, "result": result}
+        for (name, args), result in zip(pairs, results)
+    ]}
 
 
 class LocalMCP:
@@ -49,7 +85,7 @@ class LocalMCP:
 
 
 # Optional HTTP FastAPI wrapper for MCP (not required for single-process mode)
-app = FastAPI(title="MCP HTTP Server")
+app = FastAPI(title="MCP HTTP Server", default_response_class=ORJSONResponse or JSONResponse)
 
 
 @app.get("/tools")
@@ -61,18 +97,18 @@ async def _list_tools():
 async def _invoke_tool(tool_name: str, payload: Dict[str, Any]):
     if tool_name not in _TOOL_REGISTRY:
         raise HTTPException(status_code=404, detail="tool not found")
-    fn = _TOOL_REGISTRY[tool_name]
     try:
-        if inspect.iscoroutinefunction(fn):
-            result = await fn(**payload)
-        else:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, lambda: fn(**payload))
-        return {"success": True, "result": result}
+        result = await invoke_local(tool_name, payload)
+        body = {"success": True, "result": result}
+        # Tool results are already JSON-shaped; returning a response skips FastAPI's
+        # jsonable_encoder walk over the whole payload and lets orjson encode it directly
+        return ORJSONResponse(body) if ORJSONResponse else body
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 def serve_http(host: str = "0.0.0.0", port: int = 8000):
     """Start the HTTP server for remote tool invocation."""
+    from mcp import load_tools
+    load_tools()
     uvicorn.run(app, host=host, port=port)
\ No newline at end of file
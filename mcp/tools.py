@@ -1,65 +1,219 @@
 # mcp/tools.py
 import re
 from datetime import datetime
-from kubernetes import client, config
+from functools import lru_cache
 from mcp.server import tool
+from mcp.cache import cached, ttl_cache, TTL_SLOW, ALL_NAMESPACES
+from mcp._kube import _core, _apps, _custom, _call
 
-# Initialize Kubernetes client
 try:
-    config.load_kube_config()
-except:
-    # Fallback to in-cluster config if running inside k8s
-    try:
-        config.load_incluster_config()
-    except:
-        print("Warning: Could not load Kubernetes config")
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Log sanitization: one alternation so the log is scanned once; the matched group picks the placeholder.
+# Tokens only start at the beginning of a hex run and email parts are length-bounded (RFC 5321
+# limits), so dotted or hex-heavy lines fail fast instead of backtracking quadratically.
+_RE_SANITIZE = re.compile(
+    r"(?P<TOKEN>(?<![A-Fa-f0-9])[A-Fa-f0-9]{30,})"
+    r"|(?P<IP>\b\d{1,3}(?:\.\d{1,3}){3}\b)"
+    r"|(?P<EMAIL>\b[\w.-]{1,64}@[\w.-]{1,255}\.[A-Za-z]{2,24}\b)"
+)
+_REDACTED = {"TOKEN": "[REDACTED_TOKEN]", "IP": "[REDACTED_IP]", "EMAIL": "[REDACTED_EMAIL]"}
+
+# Quantity suffix multipliers: memory to bytes, CPU to millicores
+_MEM_MULT = {"Ki": 1024, "Mi": 1024 ** 2, "Gi": 1024 ** 3, "Ti": 1024 ** 4, "Pi": 1024 ** 5, "Ei": 1024 ** 6}
+_MEM_DECIMAL_MULT = {"k": 10 ** 3, "M": 10 ** 6, "G": 10 ** 9, "T": 10 ** 12, "P": 10 ** 15, "E": 10 ** 18}
+_CPU_MILLI_MULT = {"m": 1, "u": 1e-3, "n": 1e-6}
+
 
-v1 = client.CoreV1Api()
-custom = client.CustomObjectsApi()
-apps_v1 = client.AppsV1Api()
+_iso = datetime.isoformat
 
 
 def _ts_to_iso(ts):
-    """Convert kubernetes timestamp to ISO string."""
-    if ts is None:
-        return None
-    if isinstance(ts, datetime):
-        return ts.isoformat()
-    return str(ts)
+    """Convert kubernetes timestamp to ISO string.
+    
+    Only needed for typed model objects, whose timestamps are always datetime (or None);
+    raw-JSON lists already carry RFC 3339 strings.
+    """
+    return _iso(ts) if ts is not None else None
+
+
+def _list_raw(api_fn, *args, **kwargs) -> dict:
+    """Call a list endpoint and return the parsed JSON body as plain dicts.
+    
+    Skips the client's typed model deserialization, which dominates the cost
+    of large lists when only a few fields are read back out.
+    """
+    resp = api_fn(*args, _preload_content=False, **kwargs)
+    return _json_loads(resp.data)
+
+
+# Page size for chunked LISTs; keeps each apiserver response (and parse) small
+_PAGE_SIZE = 250
+
+
+def _list_paged(api_fn, *args, limit: int = 500, **kwargs) -> dict:
+    """Raw-JSON LIST fetched page by page (limit/continue), stopping after `limit` items.
+    
+    Returns {"items": [...], "truncated": bool}; truncated means more items exist.
+    """
+    items = []
+    token = None
+    limit = max(limit, 1)  # limit=0 would mean "no limit" to the apiserver
+    while True:
+        page = _list_raw(api_fn, *args, limit=min(_PAGE_SIZE, limit - len(items)), _continue=token, **kwargs)
+        items.extend(page.get("items") or [])
+        token = (page.get("metadata") or {}).get("continue")
+        if not token or len(items) >= limit:
+            return {"items": items, "truncated": bool(token)}
+
+
+def _scoped(namespaced_fn, all_fn, namespace: str):
+    """Return (api_fn, args) for a LIST in namespace, or across the cluster for "all"/"*"."""
+    if namespace in ALL_NAMESPACES:
+        return all_fn, ()
+    return namespaced_fn, (namespace,)
+
+
+def _listing(key: str, items: list, truncated: bool, next_page_token: str = None) -> dict:
+    """Tool result for a list, flagged when the limit cut it short.
+    
+    next_page_token, when given, is passed back as page_token to fetch the rest.
+    """
+    result = {key: items}
+    if truncated:
+        result["truncated"] = True
+    if next_page_token:
+        result["next_page_token"] = next_page_token
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _parse_mem(mem: str) -> int:
+    """Convert a memory quantity like "128Mi" or "500M" to bytes (0 if unparseable)."""
+    try:
+        mult = _MEM_MULT.get(mem[-2:])
+        if mult:
+            return int(float(mem[:-2]) * mult)
+        mult = _MEM_DECIMAL_MULT.get(mem[-1])
+        if mult:
+            return int(float(mem[:-1]) * mult)
+        return int(float(mem))
+    except ValueError:
+        return 0
+
+
+@lru_cache(maxsize=1024)
+def _parse_cpu(cpu: str) -> int:
+    """Convert a CPU quantity like "250m", "1200u", "12345n" or "1.5" to millicores."""
+    mult = _CPU_MILLI_MULT.get(cpu[-1])
+    if mult:
+        return int(float(cpu[:-1]) * mult)
+    return int(float(cpu) * 1000)
+
+
+# Server-side table rendering: the API server returns only kubectl's printed columns
+_TABLE_ACCEPT = "application/json;as=Table;g=meta.k8s.io;v=v1"
+
+
+def _get_pods_summary(namespace: str, field_selector: str = None, limit: int = 500):
+    """List pods via the Table API, skipping spec/status on the wire entirely."""
+    all_namespaces = namespace in ALL_NAMESPACES
+    # Table rows carry no namespace column, so cluster-wide listings need object metadata
+    query = [("includeObject", "Metadata" if all_namespaces else "None"), ("limit", limit)]
+    if field_selector:
+        query.append(("fieldSelector", field_selector))
+    resp = _core().api_client.call_api(
+        "/api/v1/pods" if all_namespaces else "/api/v1/namespaces/{namespace}/pods", "GET",
+        path_params={} if all_namespaces else {"namespace": namespace},
+        query_params=query,
+        header_params={"Accept": _TABLE_ACCEPT},
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=False,
+    )
+    table = _json_loads(resp.data)
+    
+    columns = [c["name"] for c in table.get("columnDefinitions", [])]
+    out = []
+    for row in table.get("rows", []):
+        cells = dict(zip(columns, row["cells"]))
+        out.append({
+            "name": cells.get("Name"),
+            "namespace": row["object"]["metadata"].get("namespace") if all_namespaces else namespace,
+            "status": cells.get("Status"),
+            "ready": cells.get("Ready"),
+            "restarts": cells.get("Restarts"),
+            "age": cells.get("Age")
+        })
+    return _listing("pods", out, bool((table.get("metadata") or {}).get("continue")))
+
+
+# PartialObjectMetadataList: items carry only metadata, no data/spec/status. The plain JSON
+# fallback keeps this working against apiservers that can't serve it (metadata is read the same way)
+_METADATA_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+
+
+def _list_metadata(resource: str, namespace: str) -> list:
+    """Metadata dicts of the core/v1 `resource` objects in namespace (e.g. "configmaps")."""
+    resp = _core().api_client.call_api(
+        f"/api/v1/namespaces/{{namespace}}/{resource}", "GET",
+        path_params={"namespace": namespace},
+        query_params=[("resourceVersion", "0")],
+        header_params={"Accept": _METADATA_ACCEPT},
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=False,
+    )
+    return [item["metadata"] for item in _json_loads(resp.data).get("items") or ()]
 
 
 @tool()
-async def get_pods(namespace: str = "default", **kwargs):
+async def get_pods(namespace: str = "default", mode: str = "full", field_selector: str = None, limit: int = 500, **kwargs):
     """List all pods in a namespace with their status.
     
     Args:
-        namespace: The namespace to list pods from (default: "default")
+        namespace: The namespace to list pods from (default: "default"; "all" for every namespace)
+        mode: "full" (default) or "summary" for kubectl-style columns (status reason, human age) at a fraction of the payload
+        field_selector: Optional server-side filter, e.g. "status.phase=Running"
+        limit: Maximum number of pods to return (default: 500)
     """
     try:
-        pods = v1.list_namespaced_pod(namespace)
+        if mode == "summary":
+            return await _call(_get_pods_summary, namespace, field_selector, limit)
+        list_fn, args = _scoped(_core().list_namespaced_pod, _core().list_pod_for_all_namespaces, namespace)
+        pods = await _call(
+            cached,
+            ("pods", namespace, field_selector, limit),
+            lambda: _list_paged(list_fn, *args, limit=limit, field_selector=field_selector)
+        )
     except Exception as e:
         return {"error": f"failed to list pods: {e}"}
     
     out = []
-    for pod in pods.items:
-        status = "Unknown"
-        if pod.status.phase:
-            status = pod.status.phase
+    for pod in pods["items"]:
+        metadata = pod["metadata"]
+        pod_status = pod.get("status", {})
+        status = pod_status.get("phase") or "Unknown"
         
         containers_ready = 0
-        total_containers = len(pod.spec.containers)
-        if pod.status.container_statuses:
-            containers_ready = sum(1 for c in pod.status.container_statuses if c.ready)
+        restarts = 0
+        for c in pod_status.get("containerStatuses") or ():
+            containers_ready += c.get("ready", False)
+            restarts += c.get("restartCount", 0)
+        total_containers = len(pod["spec"]["containers"])
         
         out.append({
-            "name": pod.metadata.name,
-            "namespace": pod.metadata.namespace,
+            "name": metadata["name"],
+            "namespace": metadata.get("namespace"),
             "status": status,
             "ready": f"{containers_ready}/{total_containers}",
-            "restarts": sum(c.restart_count for c in (pod.status.container_statuses or [])),
-            "age": _ts_to_iso(pod.metadata.creation_timestamp)
+            "restarts": restarts,
+            "age": metadata.get("creationTimestamp")
         })
-    return {"pods": out}
+    return _listing("pods", out, pods["truncated"])
 
 
 @tool()
@@ -77,16 +231,17 @@ async def get_pod_logs(pod_name: str = None, namespace: str = "default", tail_li
         return {"error": "pod_name or pod parameter is required"}
     
     try:
-        raw = v1.read_namespaced_pod_log(name=actual_pod_name, namespace=namespace, tail_lines=tail_lines)
+        raw = await _call(_core().read_namespaced_pod_log, name=actual_pod_name, namespace=namespace, tail_lines=tail_lines)
     except Exception as e:
         return {"error": f"failed to fetch logs: {e}"}
     
-    sanitized = re.sub(r"[A-Fa-f0-9]{30,}", "[REDACTED_TOKEN]", raw)
-    sanitized = re.sub(r"\b\d{1,3}(?:\.\d{1,3}){3}\b", "[REDACTED_IP]", sanitized)
-    sanitized = re.sub(r"\b[\w\.-]+@[\w\.-]+\.\w{2,}\b", "[REDACTED_EMAIL]", sanitized)
+    # Trim before sanitizing so bytes that would be discarded aren't scanned; drop the
+    # partial first line so a token or email cut at the boundary can't slip through
+    if len(raw) > 50_000:
+        raw = raw[-50_000:]
+        raw = raw[raw.find("\n") + 1:]
     
-    if len(sanitized) > 50_000:
-        sanitized = sanitized[-50_000:]
+    sanitized = _RE_SANITIZE.sub(lambda m: _REDACTED[m.lastgroup], raw)
     
     return {"pod": actual_pod_name, "namespace": namespace, "logs": sanitized}
 
@@ -105,7 +260,8 @@ async def get_pod_metrics(pod_name: str = None, namespace: str = "default", pod:
         return {"error": "pod_name or pod parameter is required"}
     
     try:
-        resp = custom.get_namespaced_custom_object(
+        resp = await _call(
+            _custom().get_namespaced_custom_object,
             group="metrics.k8s.io",
             version="v1beta1",
             namespace=namespace,
@@ -120,23 +276,9 @@ async def get_pod_metrics(pod_name: str = None, namespace: str = "default", pod:
             cpu = usage.get("cpu")
             
             if mem:
-                if mem.endswith("Ki"):
-                    mem_bytes += int(float(mem[:-2]) * 1024)
-                elif mem.endswith("Mi"):
-                    mem_bytes += int(float(mem[:-2]) * 1024 * 1024)
-                elif mem.endswith("Gi"):
-                    mem_bytes += int(float(mem[:-2]) * 1024 * 1024 * 1024)
-                else:
-                    try:
-                        mem_bytes += int(mem)
-                    except:
-                        pass
-            
+                mem_bytes += _parse_mem(mem)
             if cpu:
-                if cpu.endswith("m"):
-                    cpu_millis += int(cpu[:-1])
-                else:
-                    cpu_millis += int(float(cpu) * 1000)
+                cpu_millis += _parse_cpu(cpu)
         
         return {"pod": actual_pod_name, "namespace": namespace, "memory_bytes": mem_bytes, "cpu_milli": cpu_millis}
     except Exception as e:
@@ -144,76 +286,94 @@ async def get_pod_metrics(pod_name: str = None, namespace: str = "default", pod:
 
 
 @tool()
-async def get_cluster_events(namespace: str = "default", limit: int = 50, **kwargs):
+async def get_cluster_events(namespace: str = "default", limit: int = 50, field_selector: str = None, **kwargs):
     """Return recent cluster events for the namespace.
     
     Args:
         namespace: The namespace to get events from (default: "default")
         limit: Maximum number of events to return (default: 50)
+        field_selector: Optional server-side filter, e.g. "type!=Normal" for warnings only
     """
     try:
-        evs = v1.list_namespaced_event(namespace)
+        # Let the API server apply the limit and filter so extra events are never sent or deserialized
+        evs = await _call(
+            _list_raw, _core().list_namespaced_event, namespace,
+            limit=limit, field_selector=field_selector
+        )
     except Exception as e:
         return {"error": f"failed to list events: {e}"}
     
-    out = []
-    for e in evs.items[:limit]:
-        out.append({
-            "type": e.type,
-            "reason": e.reason,
-            "message": e.message,
-            "lastTimestamp": _ts_to_iso(e.last_timestamp)
-        })
+    out = [{
+        "type": e.get("type"),
+        "reason": e.get("reason"),
+        "message": e.get("message"),
+        "lastTimestamp": e.get("lastTimestamp")
+    } for e in evs["items"]]
     return {"events": out}
 
 
 @tool()
-async def get_deployments(namespace: str = "default", **kwargs):
+async def get_deployments(namespace: str = "default", limit: int = 500, **kwargs):
     """List all deployments in a namespace.
     
     Args:
-        namespace: The namespace to list deployments from (default: "default")
+        namespace: The namespace to list deployments from (default: "default"; "all" for every namespace)
+        limit: Maximum number of deployments to return (default: 500)
     """
     try:
-        deps = apps_v1.list_namespaced_deployment(namespace)
+        list_fn, args = _scoped(_apps().list_namespaced_deployment, _apps().list_deployment_for_all_namespaces, namespace)
+        deps = await _call(
+            cached,
+            ("deployments", namespace, limit),
+            lambda: _list_paged(list_fn, *args, limit=limit)
+        )
     except Exception as e:
         return {"error": f"failed to list deployments: {e}"}
     
     out = []
-    for dep in deps.items:
+    for dep in deps["items"]:
+        metadata = dep["metadata"]
+        dep_status = dep.get("status", {})
         out.append({
-            "name": dep.metadata.name,
-            "namespace": dep.metadata.namespace,
-            "replicas": dep.spec.replicas,
-            "ready": dep.status.ready_replicas or 0,
-            "available": dep.status.available_replicas or 0,
-            "age": _ts_to_iso(dep.metadata.creation_timestamp)
+            "name": metadata["name"],
+            "namespace": metadata.get("namespace"),
+            "replicas": dep["spec"].get("replicas"),
+            "ready": dep_status.get("readyReplicas") or 0,
+            "available": dep_status.get("availableReplicas") or 0,
+            "age": metadata.get("creationTimestamp")
         })
-    return {"deployments": out}
+    return _listing("deployments", out, deps["truncated"])
 
 
 @tool()
-async def get_services(namespace: str = "default", **kwargs):
-    """List all services in a namespace.
+async def get_services(namespace: str = "default", limit: int = 500, **kwargs):
+    """List all services in a namespace. Ports are [port, protocol] pairs.
     
     Args:
-        namespace: The namespace to list services from (default: "default")
+        namespace: The namespace to list services from (default: "default"; "all" for every namespace)
+        limit: Maximum number of services to return (default: 500)
     """
     try:
-        svcs = v1.list_namespaced_service(namespace)
+        list_fn, args = _scoped(_core().list_namespaced_service, _core().list_service_for_all_namespaces, namespace)
+        svcs = await _call(
+            cached,
+            ("services", namespace, limit),
+            lambda: _list_paged(list_fn, *args, limit=limit)
+        )
     except Exception as e:
         return {"error": f"failed to list services: {e}"}
     
     out = []
-    for svc in svcs.items:
+    for svc in svcs["items"]:
+        spec = svc["spec"]
         out.append({
-            "name": svc.metadata.name,
-            "namespace": svc.metadata.namespace,
-            "type": svc.spec.type,
-            "cluster_ip": svc.spec.cluster_ip,
-            "ports": [{"port": p.port, "protocol": p.protocol} for p in (svc.spec.ports or [])]
+            "name": svc["metadata"]["name"],
+            "namespace": svc["metadata"].get("namespace"),
+            "type": spec.get("type"),
+            "cluster_ip": spec.get("clusterIP"),
+            "ports": [(p.get("port"), p.get("protocol")) for p in (spec.get("ports") or ())]
         })
-    return {"services": out}
+    return _listing("services", out, svcs["truncated"])
 
 
 @tool()
@@ -230,7 +390,7 @@ async def get_pod_details(pod_name: str = None, namespace: str = "default", pod:
         return {"error": "pod_name or pod parameter is required"}
     
     try:
-        pod_obj = v1.read_namespaced_pod(name=actual_pod_name, namespace=namespace)
+        pod_obj = await _call(_core().read_namespaced_pod, name=actual_pod_name, namespace=namespace)
     except Exception as e:
         return {"error": f"failed to get pod details: {e}"}
     
@@ -292,106 +452,93 @@ async def get_pod_details(pod_name: str = None, namespace: str = "default", pod:
 
 
 @tool()
-async def get_namespaces(**kwargs):
-    """List all namespaces in the cluster."""
+async def get_namespaces(limit: int = 500, **kwargs):
+    """List all namespaces in the cluster.
+    
+    Args:
+        limit: Maximum number of namespaces to return (default: 500)
+    """
     try:
-        namespaces = v1.list_namespace()
+        namespaces = await _call(
+            cached, ("namespaces", None, limit), lambda: _list_paged(_core().list_namespace, limit=limit)
+        )
     except Exception as e:
         return {"error": f"failed to list namespaces: {e}"}
     
     out = []
-    for ns in namespaces.items:
+    for ns in namespaces["items"]:
         out.append({
-            "name": ns.metadata.name,
-            "status": ns.status.phase,
-            "age": _ts_to_iso(ns.metadata.creation_timestamp)
+            "name": ns["metadata"]["name"],
+            "status": (ns.get("status") or {}).get("phase"),
+            "age": ns["metadata"].get("creationTimestamp")
         })
-    return {"namespaces": out}
+    return _listing("namespaces", out, namespaces["truncated"])
 
 
 @tool()
-async def get_nodes(**kwargs):
-    """List all nodes in the cluster with their status and resources."""
+async def get_nodes(limit: int = 500, **kwargs):
+    """List all nodes in the cluster with their status and resources.
+    
+    Args:
+        limit: Maximum number of nodes to return (default: 500)
+    """
     try:
-        nodes = v1.list_node()
+        nodes = await _call(cached, ("nodes", None, limit), lambda: _list_paged(_core().list_node, limit=limit))
     except Exception as e:
         return {"error": f"failed to list nodes: {e}"}
     
     out = []
-    for node in nodes.items:
+    for node in nodes["items"]:
+        node_status = node.get("status") or {}
+        
         # Node conditions
         ready = "Unknown"
-        if node.status.conditions:
-            for cond in node.status.conditions:
-                if cond.type == "Ready":
-                    ready = cond.status
-                    break
+        for cond in node_status.get("conditions") or []:
+            if cond.get("type") == "Ready":
+                ready = cond.get("status")
+                break
         
         # Resource capacity
         capacity = {}
-        if node.status.capacity:
+        if node_status.get("capacity"):
             capacity = {
-                "cpu": node.status.capacity.get("cpu", "N/A"),
-                "memory": node.status.capacity.get("memory", "N/A"),
-                "pods": node.status.capacity.get("pods", "N/A")
+                "cpu": node_status["capacity"].get("cpu", "N/A"),
+                "memory": node_status["capacity"].get("memory", "N/A"),
+                "pods": node_status["capacity"].get("pods", "N/A")
             }
         
         # Resource allocatable
         allocatable = {}
-        if node.status.allocatable:
+        if node_status.get("allocatable"):
             allocatable = {
-                "cpu": node.status.allocatable.get("cpu", "N/A"),
-                "memory": node.status.allocatable.get("memory", "N/A"),
-                "pods": node.status.allocatable.get("pods", "N/A")
+                "cpu": node_status["allocatable"].get("cpu", "N/A"),
+                "memory": node_status["allocatable"].get("memory", "N/A"),
+                "pods": node_status["allocatable"].get("pods", "N/A")
             }
         
+        node_info = node_status.get("nodeInfo")
         out.append({
-            "name": node.metadata.name,
+            "name": node["metadata"]["name"],
             "ready": ready,
             "capacity": capacity,
             "allocatable": allocatable,
-            "age": _ts_to_iso(node.metadata.creation_timestamp),
-            "version": node.status.node_info.kubelet_version if node.status.node_info else "Unknown"
+            "age": node["metadata"].get("creationTimestamp"),
+            "version": node_info.get("kubeletVersion") if node_info else "Unknown"
         })
-    return {"nodes": out}
+    return _listing("nodes", out, nodes["truncated"])
 
 
 @tool()
-async def get_resource_quotas(namespace: str = "default", **kwargs):
-    """Get resource quotas for a namespace.
+@ttl_cache("persistent_volumes", TTL_SLOW)
+async def get_persistent_volumes(limit: int = 200, page_token: str = None, **kwargs):
+    """List all persistent volumes in the cluster.
     
     Args:
-        namespace: The namespace to get quotas from (default: "default")
+        limit: Maximum number of PVs to return (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
     try:
-        quotas = v1.list_namespaced_resource_quota(namespace)
-    except Exception as e:
-        return {"error": f"failed to list resource quotas: {e}"}
-    
-    out = []
-    for quota in quotas.items:
-        hard = {}
-        used = {}
-        
-        if quota.status.hard:
-            hard = dict(quota.status.hard)
-        if quota.status.used:
-            used = dict(quota.status.used)
-        
-        out.append({
-            "name": quota.metadata.name,
-            "namespace": namespace,
-            "hard": hard,
-            "used": used
-        })
-    return {"resource_quotas": out}
-
-
-@tool()
-async def get_persistent_volumes(**kwargs):
-    """List all persistent volumes in the cluster."""
-    try:
-        pvs = v1.list_persistent_volume()
+        pvs = await _call(_core().list_persistent_volume, limit=max(limit, 1), _continue=page_token)
     except Exception as e:
         return {"error": f"failed to list persistent volumes: {e}"}
     
@@ -405,30 +552,51 @@ async def get_persistent_volumes(**kwargs):
             "claim": f"{pv.spec.claim_ref.namespace}/{pv.spec.claim_ref.name}" if pv.spec.claim_ref else "Unbound",
             "storage_class": pv.spec.storage_class_name or "N/A"
         })
-    return {"persistent_volumes": out}
+    return _listing("persistent_volumes", out, bool(pvs.metadata._continue), pvs.metadata._continue)
 
 
 @tool()
-async def get_persistent_volume_claims(namespace: str = "default", **kwargs):
+@ttl_cache("persistent_volume_claims", TTL_SLOW)
+async def get_persistent_volume_claims(
+    namespace: str = "default",
+    pending_only: bool = False,
+    limit: int = 200,
+    page_token: str = None,
+    **kwargs
+):
     """List all persistent volume claims in a namespace.
     
+    A Pending PVC means no PV is available and pods using it cannot start.
+    
     Args:
-        namespace: The namespace to list PVCs from (default: "default")
+        namespace: The namespace to list PVCs from (default: "default"; "all" for every namespace)
+        pending_only: Only return Pending PVCs (default: False)
+        limit: Maximum number of PVCs to fetch (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
     try:
-        pvcs = v1.list_namespaced_persistent_volume_claim(namespace)
+        list_fn, args = _scoped(
+            _core().list_namespaced_persistent_volume_claim,
+            _core().list_persistent_volume_claim_for_all_namespaces,
+            namespace
+        )
+        pvcs = await _call(list_fn, *args, limit=max(limit, 1), _continue=page_token)
     except Exception as e:
         return {"error": f"failed to list persistent volume claims: {e}"}
     
     out = []
     for pvc in pvcs.items:
+        # PVCs have no status.phase field selector, so this filter can't be pushed to the apiserver
+        if pending_only and pvc.status.phase != "Pending":
+            continue
         out.append({
             "name": pvc.metadata.name,
-            "namespace": namespace,
+            "namespace": pvc.metadata.namespace,
             "status": pvc.status.phase,
             "volume": pvc.spec.volume_name or "N/A",
             "capacity": pvc.status.capacity.get("storage", "N/A") if pvc.status.capacity else "N/A",
             "access_modes": pvc.spec.access_modes or [],
-            "storage_class": pvc.spec.storage_class_name or "N/A"
+            "storage_class": pvc.spec.storage_class_name or "N/A",
+            "issue": "PVC is Pending - no PV available!" if pvc.status.phase == "Pending" else None
         })
-    return {"persistent_volume_claims": out}
\ No newline at end of file
+    return _listing("persistent_volume_claims", out, bool(pvcs.metadata._continue), pvcs.metadata._continue)
\ No newline at end of file
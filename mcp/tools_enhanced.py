@@ -1,25 +1,165 @@
 # mcp/tools_enhanced.py
 # Additional tools for networking, storage, configuration, and advanced troubleshooting
 
+import time
+import asyncio
+import functools
+import threading
+from collections import Counter
+from decimal import Decimal
 from mcp.server import tool
-from kubernetes import client, config
-import subprocess
-import shlex
+from mcp._kube import _api_client, _core, _apps, _networking, _rbac, _exec_core, _call, _call_exec
+from mcp.tools import _PAGE_SIZE, _listing, _list_metadata, _scoped
+from mcp.tools import get_persistent_volumes, get_persistent_volume_claims  # noqa: F401 (re-export)
+from mcp.cache import cached, invalidate, ttl_cache, TTL_FAST, TTL_SLOW
+from mcp.informer import get_cluster_cache, ready_nodes, build_sa_index, pod_config_refs
+from kubernetes.client.exceptions import ApiException
+from kubernetes.utils import parse_quantity
+from kubernetes.stream import stream
 import yaml
 import json
 
-# Initialize clients
-v1 = client.CoreV1Api()
-apps_v1 = client.AppsV1Api()
-networking_v1 = client.NetworkingV1Api()
-storage_v1 = client.StorageV1Api()
-rbac_v1 = client.RbacAuthorizationV1Api()
+try:
+    from yaml import CSafeDumper as _YamlDumper  # libyaml emitter
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+
+# stream() patches and restores that client's request method around the
+# handshake, so concurrent execs must not interleave that part
+_EXEC_SETUP_LOCK = threading.Lock()
+
+# Max probes in flight for test_connectivity_matrix; matches the exec pool in mcp._kube,
+# which keeps probes off the workers and apiserver slots that other tools use
+_MATRIX_CONCURRENCY = 8
+
+
+# Unpaged LISTs in this module pass resource_version="0" so the apiserver answers from its
+# watch cache instead of a quorum read against etcd. Results may lag etcd by the cache's
+# propagation delay (normally well under a second), which is fine for diagnostics.
+
+
+def _paged(list_fn, *args, **kwargs):
+    """Yield the items of a typed LIST fetched in _PAGE_SIZE chunks (limit/continue).
+    
+    Only one page is held at a time, so callers that tally as they go never
+    materialize the whole list.
+    """
+    token = None
+    while True:
+        page = list_fn(*args, limit=_PAGE_SIZE, _continue=token, **kwargs)
+        yield from page.items
+        token = page.metadata._continue
+        if not token:
+            return
+        # A continue token already pins the snapshot; resourceVersion can't be combined with it
+        kwargs.pop("resource_version", None)
+
+
+def _list_all(list_fn, *args, **kwargs) -> list:
+    """Typed LIST fetched in _PAGE_SIZE chunks (limit/continue); returns every item."""
+    return list(_paged(list_fn, *args, **kwargs))
+
+
+def _k8s_tool(op: str):
+    """Decorator turning a tool's exceptions into {"error": ...} results.
+    
+    API errors also carry the HTTP status, so callers can tell a 404 from a 403.
+    """
+    def _decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except ApiException as e:
+                return {"error": f"failed to {op}: {e.status} {e.reason}", "status": e.status}
+            except Exception as e:
+                return {"error": f"failed to {op}: {e}"}
+        return wrapper
+    return _decorator
+
+
+def _netpol_peer(peer) -> dict:
+    """Reduce a NetworkPolicyPeer to its selectors/CIDR; an empty selector ({}) matches everything."""
+    out = {}
+    if peer.ip_block:
+        out["ip_block"] = peer.ip_block.cidr
+        if peer.ip_block._except:
+            out["except"] = peer.ip_block._except
+    if peer.pod_selector:
+        out["pod_selector"] = dict(peer.pod_selector.match_labels or {})
+    if peer.namespace_selector:
+        out["namespace_selector"] = dict(peer.namespace_selector.match_labels or {})
+    return out
+
+
+def _exec_in_pod(pod_name: str, namespace: str, command: list, timeout: int):
+    """Run command in a pod over the exec API; return (returncode, stdout, stderr).
+    
+    Raises TimeoutError if the command is still running after timeout seconds.
+    """
+    with _EXEC_SETUP_LOCK:
+        resp = stream(
+            _exec_core().connect_get_namespaced_pod_exec,
+            pod_name,
+            namespace,
+            command=command,
+            stderr=True,
+            stdin=False,
+            stdout=True,
+            tty=False,
+            _preload_content=False,
+            _request_timeout=timeout
+        )
+    try:
+        resp.run_forever(timeout=timeout)
+        if resp.is_open():
+            raise TimeoutError(f"command did not finish within {timeout}s")
+        return resp.returncode, resp.read_stdout(), resp.read_stderr()
+    finally:
+        resp.close()
 
 
 # ==========================================
 # YAML RETRIEVAL TOOLS (NEW)
 # ==========================================
 
+# Rendered manifests are keyed by resourceVersion, so an unchanged object is never
+# re-sanitized or re-dumped; the TTL only bounds how long old versions linger
+_YAML_CACHE_TTL = 30
+
+
+# Metadata kept in rendered manifests; everything else there is server-populated
+_MANIFEST_METADATA = (
+    ("name", "name"),
+    ("namespace", "namespace"),
+    ("labels", "labels"),
+    ("annotations", "annotations"),
+    ("ownerReferences", "owner_references")
+)
+
+
+def _manifest_yaml(kind: str, obj, drop_spec: tuple = ()) -> str:
+    """Render obj as YAML: apiVersion, kind, the kept metadata and spec minus drop_spec.
+    
+    Only the projected parts are serialized, so status and managedFields are never walked.
+    """
+    def _render():
+        serialize = _api_client().sanitize_for_serialization
+        metadata = {}
+        for key, attr in _MANIFEST_METADATA:
+            value = getattr(obj.metadata, attr)
+            if value:
+                metadata[key] = serialize(value)
+        spec = serialize(obj.spec) or {}
+        for field in drop_spec:
+            spec.pop(field, None)
+        manifest = {"apiVersion": obj.api_version, "kind": obj.kind, "metadata": metadata, "spec": spec}
+        return yaml.dump(manifest, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
+    
+    key = (f"{kind}_yaml", obj.metadata.namespace, obj.metadata.name, obj.metadata.resource_version)
+    return cached(key, _render, ttl=_YAML_CACHE_TTL)
+
 @tool()
 async def get_deployment_yaml(deployment_name: str, namespace: str = "default"):
     """
@@ -31,25 +171,10 @@ async def get_deployment_yaml(deployment_name: str, namespace: str = "default"):
         namespace: Namespace (default: "default")
     """
     try:
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
-        
-        # Convert to dict and clean up managed fields
-        deployment_dict = client.ApiClient().sanitize_for_serialization(deployment)
-        
-        # Remove unnecessary metadata
-        if 'metadata' in deployment_dict:
-            deployment_dict['metadata'].pop('managedFields', None)
-            deployment_dict['metadata'].pop('uid', None)
-            deployment_dict['metadata'].pop('resourceVersion', None)
-            deployment_dict['metadata'].pop('generation', None)
-            deployment_dict['metadata'].pop('creationTimestamp', None)
-            deployment_dict['metadata'].pop('selfLink', None)
+        deployment = await _call(_apps().read_namespaced_deployment, deployment_name, namespace)
         
-        # Remove status section
-        deployment_dict.pop('status', None)
-        
-        # Convert to YAML
-        yaml_content = yaml.dump(deployment_dict, default_flow_style=False, sort_keys=False)
+        # Only the user-facing metadata and spec; managed fields and status are left out
+        yaml_content = await _call(_manifest_yaml, "deployment", deployment)
         
         return {
             "deployment": deployment_name,
@@ -58,7 +183,7 @@ async def get_deployment_yaml(deployment_name: str, namespace: str = "default"):
             "replicas": deployment.spec.replicas,
             "image": deployment.spec.template.spec.containers[0].image if deployment.spec.template.spec.containers else "N/A"
         }
-    except client.exceptions.ApiException as e:
+    except ApiException as e:
         if e.status == 404:
             return {"error": f"Deployment '{deployment_name}' not found in namespace '{namespace}'"}
         return {"error": f"API error: {e.reason}"}
@@ -76,30 +201,16 @@ async def get_pod_yaml(pod_name: str, namespace: str = "default"):
         namespace: Namespace (default: "default")
     """
     try:
-        pod = v1.read_namespaced_pod(pod_name, namespace)
-        
-        # Convert to dict and clean up
-        pod_dict = client.ApiClient().sanitize_for_serialization(pod)
-        
-        # Remove unnecessary metadata
-        if 'metadata' in pod_dict:
-            pod_dict['metadata'].pop('managedFields', None)
-            pod_dict['metadata'].pop('uid', None)
-            pod_dict['metadata'].pop('resourceVersion', None)
-            pod_dict['metadata'].pop('creationTimestamp', None)
-            pod_dict['metadata'].pop('selfLink', None)
+        pod = await _call(_core().read_namespaced_pod, pod_name, namespace)
         
-        # Remove status
-        pod_dict.pop('status', None)
-        
-        yaml_content = yaml.dump(pod_dict, default_flow_style=False, sort_keys=False)
+        yaml_content = await _call(_manifest_yaml, "pod", pod)
         
         return {
             "pod": pod_name,
             "namespace": namespace,
             "yaml": yaml_content
         }
-    except client.exceptions.ApiException as e:
+    except ApiException as e:
         if e.status == 404:
             return {"error": f"Pod '{pod_name}' not found in namespace '{namespace}'"}
         return {"error": f"API error: {e.reason}"}
@@ -117,36 +228,20 @@ async def get_service_yaml(service_name: str, namespace: str = "default"):
         namespace: Namespace (default: "default")
     """
     try:
-        service = v1.read_namespaced_service(service_name, namespace)
-        
-        service_dict = client.ApiClient().sanitize_for_serialization(service)
-        
-        if 'metadata' in service_dict:
-            service_dict['metadata'].pop('managedFields', None)
-            service_dict['metadata'].pop('uid', None)
-            service_dict['metadata'].pop('resourceVersion', None)
-            service_dict['metadata'].pop('creationTimestamp', None)
-            service_dict['metadata'].pop('selfLink', None)
+        service = await _call(_core().read_namespaced_service, service_name, namespace)
         
-        service_dict.pop('status', None)
-        
-        # Remove clusterIP and clusterIPs as they're auto-assigned
-        if 'spec' in service_dict:
-            service_dict['spec'].pop('clusterIP', None)
-            service_dict['spec'].pop('clusterIPs', None)
-            service_dict['spec'].pop('internalTrafficPolicy', None)
-            service_dict['spec'].pop('ipFamilies', None)
-            service_dict['spec'].pop('ipFamilyPolicy', None)
-            service_dict['spec'].pop('sessionAffinity', None)
-        
-        yaml_content = yaml.dump(service_dict, default_flow_style=False, sort_keys=False)
+        # Also drop clusterIP(s) and the other auto-assigned spec fields
+        yaml_content = await _call(
+            _manifest_yaml, "service", service,
+            ('clusterIP', 'clusterIPs', 'internalTrafficPolicy', 'ipFamilies', 'ipFamilyPolicy', 'sessionAffinity')
+        )
         
         return {
             "service": service_name,
             "namespace": namespace,
             "yaml": yaml_content
         }
-    except client.exceptions.ApiException as e:
+    except ApiException as e:
         if e.status == 404:
             return {"error": f"Service '{service_name}' not found in namespace '{namespace}'"}
         return {"error": f"API error: {e.reason}"}
@@ -158,6 +253,67 @@ async def get_service_yaml(service_name: str, namespace: str = "default"):
 # DEPLOYMENT EDITING TOOLS (NEW)
 # ==========================================
 
+# Identical patches that arrive while one is in flight, or within this many seconds
+# after it succeeded, share its result instead of hitting the apiserver again
+_PATCH_DEDUPE_TTL = 5
+
+# (op, namespace, name, body json) -> (completed_at or None while in flight, future, seq)
+_patches = {}
+# Start counter for patches; an entry is only kept for replay if it is the object's latest
+_patch_seq = 0
+
+
+async def _dedupe_patch(op: str, namespace: str, name: str, body: dict, apply):
+    """Await apply() once per identical patch; failures are shared with waiters but not kept.
+
+    Only the latest patch started for an object is replayed after it completes, so an
+    older body is never reported as applied once a different one has gone out. If the
+    caller running a patch is cancelled, its waiters aren't: the first of them re-runs it.
+    """
+    global _patch_seq
+    obj = (op, namespace, name)
+    key = (*obj, json.dumps(body, sort_keys=True))
+    while True:
+        now = time.monotonic()
+        for stale in [k for k, (done_at, _, _) in _patches.items() if done_at is not None and now - done_at >= _PATCH_DEDUPE_TTL]:
+            del _patches[stale]
+
+        entry = _patches.get(key)
+        if entry is None:
+            break
+        try:
+            return await asyncio.shield(entry[1])
+        except asyncio.CancelledError:
+            if not entry[1].cancelled():
+                raise  # this waiter itself was cancelled
+            # The caller running the patch was cancelled; go again rather than inherit that
+
+    # A new patch for this object supersedes whatever completed before it
+    for done in [k for k, (done_at, _, _) in _patches.items() if k[:3] == obj and done_at is not None]:
+        del _patches[done]
+    _patch_seq += 1
+    seq = _patch_seq
+    future = asyncio.get_running_loop().create_future()
+    _patches[key] = (None, future, seq)
+    try:
+        result = await apply()
+    except BaseException as e:
+        # Includes cancellation of this caller; either way the key must not outlive the attempt
+        del _patches[key]
+        if isinstance(e, Exception):
+            future.set_exception(e)
+            future.exception()  # retrieved here, so an unawaited failure isn't logged as lost
+        else:
+            future.cancel()  # waiters see this and run the patch themselves
+        raise
+    future.set_result(result)
+    if any(k[:3] == obj and other[2] > seq for k, other in _patches.items()):
+        del _patches[key]  # a later patch for the object started meanwhile; don't replay this one
+    else:
+        _patches[key] = (time.monotonic(), future, seq)
+    return result
+
+
 @tool()
 async def patch_deployment_command(
     deployment_name: str,
@@ -179,29 +335,26 @@ async def patch_deployment_command(
         new_command = ["sh", "-c", "echo 'Hello' && sleep 3600"]
     """
     try:
-        # Read current deployment
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
+        # Read current deployment, to check the container exists
+        deployment = await _call(_apps().read_namespaced_deployment, deployment_name, namespace)
+        container_names = [c.name for c in deployment.spec.template.spec.containers]
         
-        # Find the container and update its command
-        container_found = False
-        for container in deployment.spec.template.spec.containers:
-            if container.name == container_name:
-                container.command = new_command
-                container_found = True
-                break
-        
-        if not container_found:
+        if container_name not in container_names:
             return {
                 "error": f"Container '{container_name}' not found in deployment '{deployment_name}'",
-                "available_containers": [c.name for c in deployment.spec.template.spec.containers]
+                "available_containers": container_names
             }
         
-        # Patch the deployment
-        apps_v1.patch_namespaced_deployment(
-            name=deployment_name,
-            namespace=namespace,
-            body=deployment
+        # Strategic merge patch: containers merge by name, so only this command is sent
+        body = {"spec": {"template": {"spec": {"containers": [{"name": container_name, "command": new_command}]}}}}
+        await _dedupe_patch(
+            "deployment", namespace, deployment_name, body,
+            lambda: _call(_apps().patch_namespaced_deployment, name=deployment_name, namespace=namespace, body=body)
         )
+        # The rollout changes the deployment, its pods and the endpoints that track them
+        invalidate("deployments", namespace)
+        invalidate("pods", namespace)
+        invalidate("endpoints", namespace)
         
         return {
             "success": True,
@@ -211,7 +364,7 @@ async def patch_deployment_command(
             "message": f"Successfully updated command for container '{container_name}' in deployment '{deployment_name}'",
             "note": "Pods will be automatically recreated with the new command"
         }
-    except client.exceptions.ApiException as e:
+    except ApiException as e:
         if e.status == 404:
             return {"error": f"Deployment '{deployment_name}' not found in namespace '{namespace}'"}
         return {"error": f"API error: {e.reason}"}
@@ -234,15 +387,15 @@ async def patch_deployment_replicas(
         namespace: Namespace (default: "default")
     """
     try:
-        # Use scale subresource for efficiency
-        scale = apps_v1.read_namespaced_deployment_scale(deployment_name, namespace)
-        scale.spec.replicas = replicas
-        
-        apps_v1.patch_namespaced_deployment_scale(
-            name=deployment_name,
-            namespace=namespace,
-            body=scale
+        # Patch only spec.replicas on the scale subresource; no read needed first
+        body = {"spec": {"replicas": replicas}}
+        await _dedupe_patch(
+            "deployment_scale", namespace, deployment_name, body,
+            lambda: _call(_apps().patch_namespaced_deployment_scale, name=deployment_name, namespace=namespace, body=body)
         )
+        invalidate("deployments", namespace)
+        invalidate("pods", namespace)
+        invalidate("endpoints", namespace)
         
         return {
             "success": True,
@@ -250,7 +403,7 @@ async def patch_deployment_replicas(
             "new_replicas": replicas,
             "message": f"Scaled deployment '{deployment_name}' to {replicas} replicas"
         }
-    except client.exceptions.ApiException as e:
+    except ApiException as e:
         if e.status == 404:
             return {"error": f"Deployment '{deployment_name}' not found in namespace '{namespace}'"}
         return {"error": f"API error: {e.reason}"}
@@ -263,43 +416,50 @@ async def patch_deployment_replicas(
 # ==========================================
 
 @tool()
-async def get_ingresses(namespace: str = "default"):
+@ttl_cache("ingresses", TTL_SLOW)
+async def get_ingresses(namespace: str = "default", limit: int = 200, page_token: str = None):
     """
     List all ingresses in a namespace.
     Helps diagnose external access issues.
+    
+    Args:
+        namespace: The namespace to list ingresses from (default: "default")
+        limit: Maximum number of ingresses to return (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
     try:
-        ingresses = networking_v1.list_namespaced_ingress(namespace)
-        out = []
-        for ing in ingresses.items:
-            rules = []
-            if ing.spec.rules:
-                for rule in ing.spec.rules:
-                    host = rule.host or "*"
-                    paths = []
-                    if rule.http and rule.http.paths:
-                        paths = [
+        ingresses = await _call(
+            _networking().list_namespaced_ingress, namespace, limit=max(limit, 1), _continue=page_token
+        )
+        out = [
+            {
+                "name": ing.metadata.name,
+                "namespace": ing.metadata.namespace,
+                "class": ing.spec.ingress_class_name,
+                "rules": [
+                    {
+                        "host": rule.host or "*",
+                        "paths": [
                             {
                                 "path": p.path,
                                 "backend": f"{p.backend.service.name}:{p.backend.service.port.number if p.backend.service.port.number else p.backend.service.port.name}"
                             }
-                            for p in rule.http.paths
+                            for p in ((rule.http.paths or ()) if rule.http else ())
                         ]
-                    rules.append({"host": host, "paths": paths})
-            
-            out.append({
-                "name": ing.metadata.name,
-                "namespace": ing.metadata.namespace,
-                "class": ing.spec.ingress_class_name,
-                "rules": rules,
+                    }
+                    for rule in (ing.spec.rules or ())
+                ],
                 "load_balancer": [lb.ip or lb.hostname for lb in (ing.status.load_balancer.ingress or [])]
-            })
-        return {"ingresses": out}
+            }
+            for ing in ingresses.items
+        ]
+        return _listing("ingresses", out, bool(ingresses.metadata._continue), ingresses.metadata._continue)
     except Exception as e:
         return {"error": f"failed to list ingresses: {e}"}
 
 
 @tool()
+@ttl_cache("endpoints", TTL_FAST)
 async def get_endpoints(service_name: str, namespace: str = "default"):
     """
     Get endpoints for a service.
@@ -308,30 +468,17 @@ async def get_endpoints(service_name: str, namespace: str = "default"):
     If endpoints list is empty, service has no backing pods (major issue).
     """
     try:
-        endpoints = v1.read_namespaced_endpoints(service_name, namespace)
-        
-        ready_addresses = []
-        not_ready_addresses = []
+        endpoints = await _call(_core().read_namespaced_endpoints, service_name, namespace)
         
-        if endpoints.subsets:
-            for subset in endpoints.subsets:
-                # Ready endpoints
-                if subset.addresses:
-                    for addr in subset.addresses:
-                        ready_addresses.append({
-                            "ip": addr.ip,
-                            "pod": addr.target_ref.name if addr.target_ref else None,
-                            "node": addr.node_name
-                        })
-                
-                # Not ready endpoints
-                if subset.not_ready_addresses:
-                    for addr in subset.not_ready_addresses:
-                        not_ready_addresses.append({
-                            "ip": addr.ip,
-                            "pod": addr.target_ref.name if addr.target_ref else None,
-                            "node": addr.node_name
-                        })
+        subsets = endpoints.subsets or ()
+        ready_addresses = [
+            {"ip": addr.ip, "pod": addr.target_ref.name if addr.target_ref else None, "node": addr.node_name}
+            for subset in subsets for addr in (subset.addresses or ())
+        ]
+        not_ready_addresses = [
+            {"ip": addr.ip, "pod": addr.target_ref.name if addr.target_ref else None, "node": addr.node_name}
+            for subset in subsets for addr in (subset.not_ready_addresses or ())
+        ]
         
         return {
             "service": service_name,
@@ -339,50 +486,53 @@ async def get_endpoints(service_name: str, namespace: str = "default"):
             "ready_endpoints": ready_addresses,
             "not_ready_endpoints": not_ready_addresses,
             "total_ready": len(ready_addresses),
-            "issue": "NO ENDPOINTS - Service has no backing pods!" if len(ready_addresses) == 0 else None
+            "issue": "NO ENDPOINTS - Service has no backing pods!" if not ready_addresses else None
         }
     except Exception as e:
         return {"error": f"failed to get endpoints: {e}"}
 
 
 @tool()
-async def get_network_policies(namespace: str = "default"):
+@ttl_cache("network_policies", TTL_SLOW)
+async def get_network_policies(namespace: str = "default", limit: int = 200, page_token: str = None):
     """
     List network policies in a namespace.
     Network policies can block traffic - important for connectivity issues.
+    Rule ports are [port, protocol] pairs.
+    
+    Args:
+        namespace: The namespace to list policies from (default: "default")
+        limit: Maximum number of policies to return (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
     try:
-        policies = networking_v1.list_namespaced_network_policy(namespace)
-        out = []
-        for policy in policies.items:
-            pod_selector = dict(policy.spec.pod_selector.match_labels or {}) if policy.spec.pod_selector else {}
-            
-            ingress_rules = []
-            if policy.spec.ingress:
-                for rule in policy.spec.ingress:
-                    ingress_rules.append({
-                        "from": [str(f) for f in (rule._from or [])],
-                        "ports": [{"port": p.port, "protocol": p.protocol} for p in (rule.ports or [])]
-                    })
-            
-            egress_rules = []
-            if policy.spec.egress:
-                for rule in policy.spec.egress:
-                    egress_rules.append({
-                        "to": [str(t) for t in (rule.to or [])],
-                        "ports": [{"port": p.port, "protocol": p.protocol} for p in (rule.ports or [])]
-                    })
-            
-            out.append({
+        policies = await _call(
+            _networking().list_namespaced_network_policy, namespace, limit=max(limit, 1), _continue=page_token
+        )
+        out = [
+            {
                 "name": policy.metadata.name,
                 "namespace": policy.metadata.namespace,
-                "pod_selector": pod_selector,
+                "pod_selector": dict(policy.spec.pod_selector.match_labels or {}) if policy.spec.pod_selector else {},
                 "policy_types": policy.spec.policy_types,
-                "ingress_rules": ingress_rules,
-                "egress_rules": egress_rules
-            })
-        
-        return {"network_policies": out}
+                "ingress_rules": [
+                    {
+                        "from": [_netpol_peer(f) for f in (rule._from or ())],
+                        "ports": [(p.port, p.protocol) for p in (rule.ports or ())]
+                    }
+                    for rule in (policy.spec.ingress or ())
+                ],
+                "egress_rules": [
+                    {
+                        "to": [_netpol_peer(t) for t in (rule.to or ())],
+                        "ports": [(p.port, p.protocol) for p in (rule.ports or ())]
+                    }
+                    for rule in (policy.spec.egress or ())
+                ]
+            }
+            for policy in policies.items
+        ]
+        return _listing("network_policies", out, bool(policies.metadata._continue), policies.metadata._continue)
     except Exception as e:
         return {"error": f"failed to list network policies: {e}"}
 
@@ -391,7 +541,7 @@ async def get_network_policies(namespace: str = "default"):
 async def test_dns_from_pod(pod_name: str = None, namespace: str = "default", dns_name: str = "kubernetes.default.svc.cluster.local", pod: str = None):
     """
     Test DNS resolution from inside a pod.
-    Uses kubectl exec to run nslookup/dig.
+    Runs nslookup in the pod via the exec API.
     
     CRITICAL for debugging "service not found" errors.
     
@@ -406,35 +556,22 @@ async def test_dns_from_pod(pod_name: str = None, namespace: str = "default", dn
         return {"error": "pod_name or pod parameter is required"}
     
     try:
-        # Sanitize inputs to prevent command injection
-        safe_namespace = shlex.quote(namespace)
-        safe_pod_name = shlex.quote(actual_pod_name)
-        safe_dns_name = shlex.quote(dns_name)
-        
-        # Try to exec into pod and test DNS
-        exec_command = [
-            'kubectl', 'exec', '-n', safe_namespace, safe_pod_name, '--',
-            'nslookup', safe_dns_name
-        ]
-        
-        result = subprocess.run(
-            exec_command,
-            capture_output=True,
-            text=True,
-            timeout=10
+        # Arguments go over the exec API as an argv list, never through a shell
+        returncode, stdout, stderr = await _call_exec(
+            _exec_in_pod, actual_pod_name, namespace, ['nslookup', dns_name], 10
         )
         
         return {
             "pod": actual_pod_name,
             "dns_query": dns_name,
-            "success": result.returncode == 0,
-            "output": result.stdout,
-            "error": result.stderr if result.returncode != 0 else None
+            "success": returncode == 0,
+            "output": stdout,
+            "error": stderr if returncode != 0 else None
         }
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         return {"error": "DNS test timed out - pod may be unresponsive"}
     except Exception as e:
-        return {"error": f"failed to test DNS: {e}", "hint": "Ensure kubectl is available and pod has nslookup/dig"}
+        return {"error": f"failed to test DNS: {e}", "hint": "Ensure the pod is running and has nslookup/dig"}
 
 
 @tool()
@@ -448,7 +585,7 @@ async def test_connectivity_from_pod(
 ):
     """
     Test network connectivity from one pod to another service/pod.
-    Uses kubectl exec to run curl/nc (netcat).
+    Runs nc (netcat) in the pod via the exec API.
     
     Example: test if nginx pod can reach database:5432
     
@@ -467,36 +604,28 @@ async def test_connectivity_from_pod(
         return {"error": "target parameter is required"}
     
     try:
-        # Sanitize inputs to prevent command injection
-        safe_namespace = shlex.quote(source_namespace)
-        safe_pod = shlex.quote(actual_pod_name)
-        safe_target = shlex.quote(target)
         safe_port = str(int(port))  # Validate port is integer
         safe_timeout = str(int(timeout))  # Validate timeout is integer
         
-        # Try netcat first (most reliable for port testing)
-        exec_command = [
-            'kubectl', 'exec', '-n', safe_namespace, safe_pod, '--',
-            'nc', '-zv', '-w', safe_timeout, safe_target, safe_port
-        ]
-        
-        result = subprocess.run(
-            exec_command,
-            capture_output=True,
-            text=True,
-            timeout=int(timeout) + 2
+        # Netcat is the most reliable for port testing; argv goes over the exec API, no shell
+        returncode, stdout, stderr = await _call_exec(
+            _exec_in_pod,
+            actual_pod_name,
+            source_namespace,
+            ['nc', '-zv', '-w', safe_timeout, target, safe_port],
+            int(timeout) + 2
         )
         
-        success = result.returncode == 0 or "succeeded" in result.stderr.lower()
+        success = returncode == 0 or "succeeded" in stderr.lower()
         
         return {
             "source_pod": actual_pod_name,
             "target": f"{target}:{port}",
             "connection": "SUCCESS" if success else "FAILED",
-            "output": result.stdout + result.stderr,
+            "output": stdout + stderr,
             "diagnosis": "Network connectivity OK" if success else "Cannot reach target - check network policies, service exists, and pod is running"
         }
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         return {
             "source_pod": actual_pod_name,
             "target": f"{target}:{port}",
@@ -507,56 +636,56 @@ async def test_connectivity_from_pod(
         return {"error": f"failed to test connectivity: {e}", "hint": "Ensure pod has nc (netcat) or curl installed"}
 
 
-# ==========================================
-# STORAGE TOOLS (EXISTING - KEPT AS IS)
-# ==========================================
-
 @tool()
-async def get_persistent_volumes():
+async def test_connectivity_matrix(
+    source_pods: list = None,
+    targets: list = None,
+    source_namespace: str = "default",
+    timeout: int = 5
+):
     """
-    List all Persistent Volumes in cluster.
-    Shows storage issues.
+    Test connectivity from every source pod to every target in parallel.
+    Useful during triage to see which pod/target pairs are broken at a glance.
+    
+    Args:
+        source_pods: Names of the pods to test from
+        targets: Targets as "host:port" strings (port defaults to 80)
+        source_namespace: Namespace of the source pods (default: "default")
+        timeout: Timeout in seconds per probe (default: 5)
     """
-    try:
-        pvs = v1.list_persistent_volume()
-        out = []
-        for pv in pvs.items:
-            out.append({
-                "name": pv.metadata.name,
-                "capacity": pv.spec.capacity.get("storage") if pv.spec.capacity else None,
-                "access_modes": pv.spec.access_modes,
-                "status": pv.status.phase,
-                "claim": f"{pv.spec.claim_ref.namespace}/{pv.spec.claim_ref.name}" if pv.spec.claim_ref else "Available",
-                "storage_class": pv.spec.storage_class_name
-            })
-        return {"persistent_volumes": out}
-    except Exception as e:
-        return {"error": f"failed to list PVs: {e}"}
+    if not source_pods or not targets:
+        return {"error": "source_pods and targets must be non-empty lists"}
+    
+    sem = asyncio.Semaphore(_MATRIX_CONCURRENCY)
+    
+    async def _probe(source_pod, target):
+        host, sep, port = str(target).rpartition(":")
+        if not sep:
+            host, port = port, 80
+        async with sem:
+            return await test_connectivity_from_pod(
+                source_pod=source_pod,
+                source_namespace=source_namespace,
+                target=host,
+                port=port,
+                timeout=timeout
+            )
+    
+    results = await asyncio.gather(*(_probe(src, tgt) for src in source_pods for tgt in targets))
+    failed = sum(1 for r in results if r.get("connection") != "SUCCESS")
+    return {
+        "results": results,
+        "total": len(results),
+        "failed": failed,
+        "diagnosis": "All pairs can connect" if not failed else f"{failed} of {len(results)} pairs cannot connect"
+    }
 
 
-@tool()
-async def get_persistent_volume_claims(namespace: str = "default"):
-    """
-    List PVCs in namespace.
-    If PVC is Pending, pod cannot start.
-    """
-    try:
-        pvcs = v1.list_namespaced_persistent_volume_claim(namespace)
-        out = []
-        for pvc in pvcs.items:
-            out.append({
-                "name": pvc.metadata.name,
-                "namespace": pvc.metadata.namespace,
-                "status": pvc.status.phase,
-                "volume": pvc.spec.volume_name,
-                "capacity": pvc.status.capacity.get("storage") if pvc.status.capacity else None,
-                "storage_class": pvc.spec.storage_class_name,
-                "access_modes": pvc.spec.access_modes,
-                "issue": "PVC is Pending - no PV available!" if pvc.status.phase == "Pending" else None
-            })
-        return {"pvcs": out}
-    except Exception as e:
-        return {"error": f"failed to list PVCs: {e}"}
+# ==========================================
+# STORAGE TOOLS
+# ==========================================
+# get_persistent_volumes / get_persistent_volume_claims live in mcp.tools
+# (imported above) so each tool name is registered exactly once.
 
 
 # ==========================================
@@ -564,51 +693,75 @@ async def get_persistent_volume_claims(namespace: str = "default"):
 # ==========================================
 
 @tool()
-async def get_configmaps(namespace: str = "default"):
+@ttl_cache("configmaps", TTL_FAST)
+@_k8s_tool("list ConfigMaps")
+async def get_configmaps(namespace: str = "default", names_only: bool = False, limit: int = 200, page_token: str = None):
     """
     List ConfigMaps in namespace.
     Missing ConfigMaps cause pod failures.
+    
+    Args:
+        namespace: The namespace to list ConfigMaps from (default: "default")
+        names_only: Return only names, without fetching any ConfigMap data (default: False)
+        limit: Maximum number of ConfigMaps to return with their keys (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
-    try:
-        cms = v1.list_namespaced_config_map(namespace)
-        out = []
-        for cm in cms.items:
-            out.append({
-                "name": cm.metadata.name,
-                "namespace": cm.metadata.namespace,
-                "keys": list(cm.data.keys()) if cm.data else [],
-                "size": len(str(cm.data)) if cm.data else 0
-            })
-        return {"configmaps": out}
-    except Exception as e:
-        return {"error": f"failed to list ConfigMaps: {e}"}
+    if names_only:
+        metas = await _call(_list_metadata, "configmaps", namespace)
+        return {"configmaps": [{"name": m["name"], "namespace": m.get("namespace")} for m in metas]}
+    # ConfigMaps carry their data, so fetch one page rather than the whole namespace
+    cms = await _call(
+        _core().list_namespaced_config_map, namespace, limit=max(limit, 1), _continue=page_token
+    )
+    out = [
+        {
+            "name": cm.metadata.name,
+            "namespace": cm.metadata.namespace,
+            "keys": list(cm.data.keys()) if cm.data else [],
+            "size": sum(map(len, cm.data.values())) if cm.data else 0
+        }
+        for cm in cms.items
+    ]
+    return _listing("configmaps", out, bool(cms.metadata._continue), cms.metadata._continue)
 
 
 @tool()
-async def get_secrets(namespace: str = "default"):
+@ttl_cache("secrets", TTL_FAST)
+@_k8s_tool("list Secrets")
+async def get_secrets(namespace: str = "default", names_only: bool = False, limit: int = 200, page_token: str = None):
     """
     List Secrets in namespace (WITHOUT exposing values).
     Missing secrets cause pod failures.
     
     SECURITY: We only show secret names and keys, NOT the actual values.
+    
+    Args:
+        namespace: The namespace to list Secrets from (default: "default")
+        names_only: Return only names, without fetching any Secret data (default: False)
+        limit: Maximum number of Secrets to return with their keys (default: 200)
+        page_token: next_page_token from a previous truncated call, to continue the listing
     """
-    try:
-        secrets = v1.list_namespaced_secret(namespace)
-        out = []
-        for secret in secrets.items:
-            out.append({
-                "name": secret.metadata.name,
-                "namespace": secret.metadata.namespace,
-                "type": secret.type,
-                "keys": list(secret.data.keys()) if secret.data else [],
-                "note": "Values are hidden for security"
-            })
-        return {"secrets": out}
-    except Exception as e:
-        return {"error": f"failed to list Secrets: {e}"}
+    if names_only:
+        metas = await _call(_list_metadata, "secrets", namespace)
+        return {"secrets": [{"name": m["name"], "namespace": m.get("namespace")} for m in metas]}
+    secrets = await _call(
+        _core().list_namespaced_secret, namespace, limit=max(limit, 1), _continue=page_token
+    )
+    out = [
+        {
+            "name": secret.metadata.name,
+            "namespace": secret.metadata.namespace,
+            "type": secret.type,
+            "keys": list(secret.data.keys()) if secret.data else [],
+            "note": "Values are hidden for security"
+        }
+        for secret in secrets.items
+    ]
+    return _listing("secrets", out, bool(secrets.metadata._continue), secrets.metadata._continue)
 
 
 @tool()
+@_k8s_tool("check config references")
 async def check_pod_config_references(pod_name: str = None, namespace: str = "default", pod: str = None):
     """
     Check if a pod's ConfigMaps and Secrets actually exist.
@@ -623,198 +776,245 @@ async def check_pod_config_references(pod_name: str = None, namespace: str = "de
     if not actual_pod_name:
         return {"error": "pod_name or pod parameter is required"}
     
-    try:
-        pod_obj = v1.read_namespaced_pod(actual_pod_name, namespace)
-        
-        missing_configs = []
-        missing_secrets = []
-        
-        # Check ConfigMap references
-        for volume in (pod_obj.spec.volumes or []):
-            if volume.config_map:
-                cm_name = volume.config_map.name
-                try:
-                    v1.read_namespaced_config_map(cm_name, namespace)
-                except:
-                    missing_configs.append(cm_name)
-        
-        # Check Secret references
-        for volume in (pod_obj.spec.volumes or []):
-            if volume.secret:
-                secret_name = volume.secret.secret_name
-                try:
-                    v1.read_namespaced_secret(secret_name, namespace)
-                except:
-                    missing_secrets.append(secret_name)
-        
-        # Check envFrom
-        for container in pod_obj.spec.containers:
-            if container.env_from:
-                for env_from in container.env_from:
-                    if env_from.config_map_ref:
-                        cm_name = env_from.config_map_ref.name
-                        try:
-                            v1.read_namespaced_config_map(cm_name, namespace)
-                        except:
-                            if cm_name not in missing_configs:
-                                missing_configs.append(cm_name)
-                    if env_from.secret_ref:
-                        secret_name = env_from.secret_ref.name
-                        try:
-                            v1.read_namespaced_secret(secret_name, namespace)
-                        except:
-                            if secret_name not in missing_secrets:
-                                missing_secrets.append(secret_name)
-        
-        return {
-            "pod": actual_pod_name,
-            "missing_configmaps": missing_configs,
-            "missing_secrets": missing_secrets,
-            "issue": "CRITICAL: Pod references non-existent ConfigMaps/Secrets!" if (missing_configs or missing_secrets) else "All config references are valid"
-        }
-    except Exception as e:
-        return {"error": f"failed to check config references: {e}"}
+    pod_obj = await _call(_core().read_namespaced_pod, actual_pod_name, namespace)
+    
+    # Collect references first, from volumes then envFrom
+    referenced_cms, referenced_secrets = pod_config_refs(pod_obj.spec)
+    
+    # One metadata-only LIST per referenced kind instead of a GET per name; the two
+    # run concurrently, and no ConfigMap or Secret data crosses the wire
+    async def _names(resource, wanted):
+        if not wanted:
+            return set()
+        return {m["name"] for m in await _call(_list_metadata, resource, namespace)}
+    
+    cm_names, secret_names = await asyncio.gather(
+        _names("configmaps", referenced_cms),
+        _names("secrets", referenced_secrets)
+    )
+    
+    missing_configs = sorted(referenced_cms - cm_names)
+    missing_secrets = sorted(referenced_secrets - secret_names)
+    
+    return {
+        "pod": actual_pod_name,
+        "missing_configmaps": missing_configs,
+        "missing_secrets": missing_secrets,
+        "issue": "CRITICAL: Pod references non-existent ConfigMaps/Secrets!" if (missing_configs or missing_secrets) else "All config references are valid"
+    }
+
+
+@tool()
+@_k8s_tool("find pods using config")
+async def find_pods_using_config(name: str, kind: str = "configmap", namespace: str = "default"):
+    """
+    List the pods that reference a ConfigMap or Secret (volumes and envFrom).
+    Answers "which pods break if I change or delete this?"
+    
+    Args:
+        name: Name of the ConfigMap or Secret
+        kind: "configmap" (default) or "secret"
+        namespace: The namespace of the ConfigMap/Secret (default: "default")
+    """
+    kind = kind.lower()
+    if kind not in ("configmap", "secret"):
+        return {"error": f"kind must be 'configmap' or 'secret', not '{kind}'"}
+    
+    # A lookup in the informer's pod index once it has synced; otherwise scan the namespace's pods
+    cache = get_cluster_cache()
+    if cache is not None and cache.is_synced("pods"):
+        pods = cache.pods_referencing(kind, namespace, name)
+    else:
+        which = 0 if kind == "configmap" else 1
+        pods = await _call(lambda: [
+            pod.metadata.name for pod in _paged(_core().list_namespaced_pod, namespace)
+            if name in pod_config_refs(pod.spec)[which]
+        ])
+    
+    return {
+        "kind": kind,
+        "name": name,
+        "namespace": namespace,
+        "pods": sorted(pods),
+        "count": len(pods)
+    }
 
 
 # ==========================================
 # NODE & RESOURCE TOOLS (EXISTING - KEPT AS IS)
 # ==========================================
 
+# Node conditions that signal a problem when "True", with the issue they report
+_NODE_PRESSURE_ISSUES = {
+    "MemoryPressure": "Node has memory pressure",
+    "DiskPressure": "Node has disk pressure",
+    "PIDPressure": "Node has PID pressure (too many processes)"
+}
+
+
 @tool()
+@ttl_cache("node_details", TTL_FAST)
+@_k8s_tool("get node details")
 async def get_node_details(node_name: str = None):
     """
     Get detailed node information including capacity, allocatable, and conditions.
     """
-    try:
-        if node_name:
-            nodes_list = [v1.read_node(node_name)]
-        else:
-            nodes_list = v1.list_node().items
-        
-        out = []
-        for node in nodes_list:
-            # Parse conditions
-            conditions = {}
-            for cond in (node.status.conditions or []):
-                conditions[cond.type] = {
-                    "status": cond.status,
-                    "reason": cond.reason,
-                    "message": cond.message
-                }
-            
-            # Check for problems
-            issues = []
-            if conditions.get("Ready", {}).get("status") != "True":
-                issues.append("Node is NOT Ready!")
-            if conditions.get("MemoryPressure", {}).get("status") == "True":
-                issues.append("Node has memory pressure")
-            if conditions.get("DiskPressure", {}).get("status") == "True":
-                issues.append("Node has disk pressure")
-            if conditions.get("PIDPressure", {}).get("status") == "True":
-                issues.append("Node has PID pressure (too many processes)")
-            
-            out.append({
-                "name": node.metadata.name,
-                "status": "Ready" if conditions.get("Ready", {}).get("status") == "True" else "NotReady",
-                "capacity": {
-                    "cpu": node.status.capacity.get("cpu"),
-                    "memory": node.status.capacity.get("memory"),
-                    "pods": node.status.capacity.get("pods")
-                },
-                "allocatable": {
-                    "cpu": node.status.allocatable.get("cpu"),
-                    "memory": node.status.allocatable.get("memory"),
-                    "pods": node.status.allocatable.get("pods")
-                },
-                "conditions": conditions,
-                "issues": issues if issues else None
-            })
+    if node_name:
+        nodes_list = [await _call(_core().read_node, node_name)]
+    else:
+        nodes_list = (await _call(_core().list_node, resource_version="0")).items
+    
+    out = []
+    for node in nodes_list:
+        # Parse conditions and spot problems in the same pass
+        conditions = {}
+        issues = []
+        ready = False
+        for cond in (node.status.conditions or []):
+            conditions[cond.type] = {
+                "status": cond.status,
+                "reason": cond.reason,
+                "message": cond.message
+            }
+            if cond.status == "True":
+                if cond.type == "Ready":
+                    ready = True
+                elif cond.type in _NODE_PRESSURE_ISSUES:
+                    issues.append(_NODE_PRESSURE_ISSUES[cond.type])
+        if not ready:
+            issues.insert(0, "Node is NOT Ready!")
         
-        return {"nodes": out}
-    except Exception as e:
-        return {"error": f"failed to get node details: {e}"}
+        out.append({
+            "name": node.metadata.name,
+            "status": "Ready" if ready else "NotReady",
+            "capacity": {
+                "cpu": node.status.capacity.get("cpu"),
+                "memory": node.status.capacity.get("memory"),
+                "pods": node.status.capacity.get("pods")
+            },
+            "allocatable": {
+                "cpu": node.status.allocatable.get("cpu"),
+                "memory": node.status.allocatable.get("memory"),
+                "pods": node.status.allocatable.get("pods")
+            },
+            "conditions": conditions,
+            "issues": issues if issues else None
+        })
+    
+    return {"nodes": out}
+
+
+# Share of a quota's hard limit in use at which the resource is reported as at its limit
+_QUOTA_AT_LIMIT = Decimal("0.95")
+
+
+def _quotas_at_limit(hard: dict, used: dict) -> list:
+    """Resources whose usage has reached _QUOTA_AT_LIMIT of the hard limit.
+    
+    Compares parsed quantities, so "2000m" used of a "2" limit counts.
+    """
+    at_limit = []
+    for resource, limit in hard.items():
+        if resource not in used:
+            continue
+        try:
+            if parse_quantity(used[resource]) >= parse_quantity(limit) * _QUOTA_AT_LIMIT:
+                at_limit.append(resource)
+        except ValueError:
+            # Not a quantity; fall back to the exact match
+            if used[resource] == limit:
+                at_limit.append(resource)
+    return at_limit
 
 
 @tool()
-async def get_resource_quotas(namespace: str = "default"):
+@ttl_cache("resource_quotas", TTL_FAST)
+@_k8s_tool("get resource quotas")
+async def get_resource_quotas(namespace: str = "default", **kwargs):
     """
     Check resource quotas in namespace.
     If quotas are maxed out, new pods cannot be created.
+    
+    Args:
+        namespace: The namespace to get quotas from (default: "default"; "all" for every namespace)
     """
-    try:
-        quotas = v1.list_namespaced_resource_quota(namespace)
-        out = []
-        for quota in quotas.items:
-            hard = dict(quota.status.hard or {})
-            used = dict(quota.status.used or {})
-            
-            at_limit = []
-            for resource, limit in hard.items():
-                if resource in used and used[resource] == limit:
-                    at_limit.append(resource)
-            
-            out.append({
-                "name": quota.metadata.name,
-                "namespace": quota.metadata.namespace,
-                "hard_limits": hard,
-                "current_usage": used,
-                "resources_at_limit": at_limit,
-                "issue": f"QUOTA EXCEEDED for: {', '.join(at_limit)}" if at_limit else None
-            })
+    list_fn, args = _scoped(_core().list_namespaced_resource_quota, _core().list_resource_quota_for_all_namespaces, namespace)
+    quotas = await _call(list_fn, *args, resource_version="0")
+    out = []
+    for quota in quotas.items:
+        hard = dict(quota.status.hard or {})
+        used = dict(quota.status.used or {})
         
-        return {"resource_quotas": out}
-    except Exception as e:
-        return {"error": f"failed to get resource quotas: {e}"}
+        at_limit = _quotas_at_limit(hard, used)
+        
+        out.append({
+            "name": quota.metadata.name,
+            "namespace": quota.metadata.namespace,
+            "hard_limits": hard,
+            "current_usage": used,
+            "resources_at_limit": at_limit,
+            "issue": f"QUOTA AT LIMIT (95%+ used) for: {', '.join(at_limit)}" if at_limit else None
+        })
+    
+    return {"resource_quotas": out}
 
 
 # ==========================================
 # RBAC TOOLS (EXISTING - KEPT AS IS)
 # ==========================================
 
+# Without the informer, the ServiceAccount -> roles index is rebuilt from two
+# cluster-wide LISTs once it is this old...
+_SA_INDEX_TTL = 300
+# ...or, when a lookup finds no roles (the binding may be newer than the index),
+# once it is this old, so repeated "no roles" checks can't force a rebuild each
+_SA_INDEX_MIN_AGE = 10
+_sa_index_lock = threading.Lock()
+_sa_index_built = (0.0, None)  # (built_at, index)
+
+
+def _sa_index(max_age: float = _SA_INDEX_TTL) -> dict:
+    """The (namespace, service_account) -> roles index, rebuilt if older than max_age seconds."""
+    global _sa_index_built
+    with _sa_index_lock:  # one build at a time; callers queued behind it reuse the fresh copy
+        built_at, index = _sa_index_built
+        started = time.monotonic()
+        if index is None or started - built_at >= max_age:
+            index = build_sa_index(
+                _list_all(_rbac().list_role_binding_for_all_namespaces, resource_version="0"),
+                _list_all(_rbac().list_cluster_role_binding, resource_version="0")
+            )
+            _sa_index_built = (started, index)
+        return index
+
+
 @tool()
+@_k8s_tool("check permissions")
 async def check_service_account_permissions(service_account: str, namespace: str = "default"):
     """
     Check what permissions a ServiceAccount has.
     Useful for debugging "Forbidden" errors.
     """
-    try:
-        # Get RoleBindings in namespace
-        role_bindings = rbac_v1.list_namespaced_role_binding(namespace)
-        cluster_role_bindings = rbac_v1.list_cluster_role_binding()
-        
-        roles_bound = []
-        
-        # Check namespace RoleBindings
-        for rb in role_bindings.items:
-            if rb.subjects:
-                for subject in rb.subjects:
-                    if subject.kind == "ServiceAccount" and subject.name == service_account:
-                        roles_bound.append({
-                            "type": "Role",
-                            "name": rb.role_ref.name,
-                            "namespace": namespace
-                        })
-        
-        # Check ClusterRoleBindings
-        for crb in cluster_role_bindings.items:
-            if crb.subjects:
-                for subject in crb.subjects:
-                    if subject.kind == "ServiceAccount" and subject.name == service_account and subject.namespace == namespace:
-                        roles_bound.append({
-                            "type": "ClusterRole",
-                            "name": crb.role_ref.name,
-                            "scope": "cluster-wide"
-                        })
-        
-        return {
-            "service_account": service_account,
-            "namespace": namespace,
-            "roles_bound": roles_bound,
-            "has_permissions": len(roles_bound) > 0,
-            "issue": "ServiceAccount has NO roles bound - likely permission denied errors" if len(roles_bound) == 0 else None
-        }
-    except Exception as e:
-        return {"error": f"failed to check permissions: {e}"}
+    # Either way this is a dict lookup: in the watch-fed informer index when it's
+    # synced, otherwise in the periodically rebuilt one
+    key = (namespace, service_account)
+    cache = get_cluster_cache()
+    if cache is not None and cache.is_synced("role_bindings", "cluster_role_bindings"):
+        roles_bound = cache.service_account_bindings(namespace, service_account)
+    else:
+        roles_bound = (await _call(_sa_index)).get(key)
+        if not roles_bound:
+            # The binding may postdate the index; don't report "no roles" from a stale copy
+            roles_bound = (await _call(_sa_index, _SA_INDEX_MIN_AGE)).get(key, [])
+        roles_bound = list(roles_bound)
+    
+    return {
+        "service_account": service_account,
+        "namespace": namespace,
+        "roles_bound": roles_bound,
+        "has_permissions": len(roles_bound) > 0,
+        "issue": "ServiceAccount has NO roles bound - likely permission denied errors" if len(roles_bound) == 0 else None
+    }
 
 
 # ==========================================
@@ -822,53 +1022,65 @@ async def check_service_account_permissions(service_account: str, namespace: str
 # ==========================================
 
 @tool()
+@ttl_cache("cluster_health", TTL_FAST)
+@_k8s_tool("get cluster health")
 async def get_cluster_health_summary():
     """
     Get a high-level health summary of the entire cluster.
     Good starting point for "what's wrong with my cluster?"
     """
-    try:
-        # Get nodes
-        nodes = v1.list_node()
-        nodes_ready = sum(1 for n in nodes.items if any(c.type == "Ready" and c.status == "True" for c in (n.status.conditions or [])))
-        nodes_total = len(nodes.items)
-        
-        # Get all pods
-        all_pods = v1.list_pod_for_all_namespaces()
-        pods_running = sum(1 for p in all_pods.items if p.status.phase == "Running")
-        pods_failed = sum(1 for p in all_pods.items if p.status.phase == "Failed")
-        pods_pending = sum(1 for p in all_pods.items if p.status.phase == "Pending")
-        pods_total = len(all_pods.items)
-        
-        # Get events (last 100)
-        events = v1.list_event_for_all_namespaces()
-        warning_events = sum(1 for e in events.items if e.type == "Warning")
-        
-        # Identify issues
-        issues = []
-        if nodes_ready < nodes_total:
-            issues.append(f"{nodes_total - nodes_ready} node(s) not ready")
-        if pods_failed > 0:
-            issues.append(f"{pods_failed} pod(s) in Failed state")
-        if pods_pending > 5:
-            issues.append(f"{pods_pending} pod(s) stuck in Pending")
-        if warning_events > 20:
-            issues.append(f"{warning_events} Warning events recently")
-        
-        return {
-            "cluster_health": "HEALTHY" if len(issues) == 0 else "DEGRADED",
-            "nodes": {
-                "ready": nodes_ready,
-                "total": nodes_total
-            },
-            "pods": {
-                "running": pods_running,
-                "failed": pods_failed,
-                "pending": pods_pending,
-                "total": pods_total
-            },
-            "recent_warnings": warning_events,
-            "issues": issues if issues else ["No major issues detected"]
-        }
-    except Exception as e:
-        return {"error": f"failed to get cluster health: {e}"}
\ No newline at end of file
+    # Served from the watch-fed cache once it has synced; LIST directly until then
+    cache = get_cluster_cache()
+    if cache is not None and cache.is_synced("nodes", "pods", "events"):
+        nodes, all_pods, events = cache.snapshot()
+        ready = cache.ready_nodes()
+        phase_counts = Counter(p.status.phase for p in all_pods)
+        warning_events = sum(1 for e in events if e.type == "Warning")
+    else:
+        # Independent reads, so issue them together. Pods and Warning events are paged
+        # and tallied as each page arrives, never held in memory as a whole
+        core = _core()
+        nodes, phase_counts, warning_events = await asyncio.gather(
+            _call(lambda: core.list_node(resource_version="0").items),
+            _call(lambda: Counter(p.status.phase for p in _paged(core.list_pod_for_all_namespaces))),
+            _call(lambda: sum(1 for _ in _paged(core.list_event_for_all_namespaces, field_selector="type=Warning")))
+        )
+        ready = ready_nodes(nodes)
+    
+    # Get nodes
+    not_ready_nodes = [n.metadata.name for n in nodes if n.metadata.name not in ready]
+    nodes_total = len(nodes)
+    nodes_ready = nodes_total - len(not_ready_nodes)
+    
+    # Pods, tallied by phase in one pass
+    pods_running = phase_counts["Running"]
+    pods_failed = phase_counts["Failed"]
+    pods_pending = phase_counts["Pending"]
+    pods_total = sum(phase_counts.values())
+    
+    # Identify issues
+    issues = []
+    if not_ready_nodes:
+        issues.append(f"{len(not_ready_nodes)} node(s) not ready: {', '.join(not_ready_nodes)}")
+    if pods_failed > 0:
+        issues.append(f"{pods_failed} pod(s) in Failed state")
+    if pods_pending > 5:
+        issues.append(f"{pods_pending} pod(s) stuck in Pending")
+    if warning_events > 20:
+        issues.append(f"{warning_events} Warning events recently")
+    
+    return {
+        "cluster_health": "HEALTHY" if len(issues) == 0 else "DEGRADED",
+        "nodes": {
+            "ready": nodes_ready,
+            "total": nodes_total
+        },
+        "pods": {
+            "running": pods_running,
+            "failed": pods_failed,
+            "pending": pods_pending,
+            "total": pods_total
+        },
+        "recent_warnings": warning_events,
+        "issues": issues if issues else ["No major issues detected"]
+    }
\ No newline at end of file
@@ -0,0 +1,43 @@
+# tests/test_agent.py
+import unittest
+
+from ai.agent import _compact, _summarize_tool_result, TOOL_RESULT_MAX_ITEMS
+
+
+class CompactToolResultTests(unittest.TestCase):
+    def test_manifests_reach_the_model_whole(self):
+        manifest = (
+            "apiVersion: apps/v1\n"
+            "kind: Deployment\n"
+            "metadata:\n"
+            "  name: web\n"
+            "spec:\n"
+            "  template:\n"
+            "    spec:\n"
+            "      containers:\n"
+            "      - name: web\n"
+            "        command: [\"sh\", \"-c\", \"sleep 3600\"]\n"
+            + "".join(f"  # filler line {i}\n" for i in range(500))
+        )
+        result = {"deployment": "web", "yaml": manifest}
+        self.assertIs(_summarize_tool_result("get_deployment_yaml", result, max_bytes=200), result)
+
+    def test_listings_keep_every_item(self):
+        result = {"pods": [{"name": f"pod-{i}", "status": "Running"} for i in range(TOOL_RESULT_MAX_ITEMS * 5)]}
+        self.assertIs(_summarize_tool_result("get_pods", result, max_bytes=200), result)
+
+    def test_long_logs_keep_their_head_and_tail(self):
+        logs = "starting up\n" + "".join(f"request {i} ok\n" for i in range(500)) + "panic: out of memory\n"
+        compacted = _summarize_tool_result("get_pod_logs", {"pod": "web", "logs": logs}, max_bytes=200)["logs"]
+
+        self.assertTrue(compacted.startswith("starting up\n"))
+        self.assertTrue(compacted.endswith("panic: out of memory\n"))
+        self.assertIn("chars omitted", compacted)
+        self.assertLess(len(compacted), 300)
+
+    def test_short_strings_are_untouched(self):
+        self.assertEqual(_compact("kind: Pod", 200), "kind: Pod")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# tests/test_tools.py
+import asyncio
+import unittest
+from types import SimpleNamespace as NS
+from unittest import mock
+
+import mcp
+from mcp.cache import invalidate
+from mcp.server import _TOOL_REGISTRY
+
+mcp.load_tools()
+import mcp.tools_enhanced as tools_enhanced
+
+
+def _quota(namespace, hard, used):
+    return NS(metadata=NS(name="quota", namespace=namespace), status=NS(hard=hard, used=used))
+
+
+class ResourceQuotaToolTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        invalidate()
+
+    async def test_registered_tool_lists_every_namespace_for_all(self):
+        core = mock.Mock()
+        core.list_resource_quota_for_all_namespaces.return_value = NS(items=[
+            _quota("a", {"pods": "10"}, {"pods": "1"}),
+            _quota("b", {"pods": "10"}, {"pods": "10"}),
+        ])
+        with mock.patch.object(tools_enhanced, "_core", return_value=core):
+            result = await _TOOL_REGISTRY["get_resource_quotas"](namespace="all")
+
+        core.list_resource_quota_for_all_namespaces.assert_called_once_with(resource_version="0")
+        core.list_namespaced_resource_quota.assert_not_called()
+        self.assertEqual([q["namespace"] for q in result["resource_quotas"]], ["a", "b"])
+        self.assertEqual(result["resource_quotas"][1]["resources_at_limit"], ["pods"])
+
+    async def test_registered_tool_lists_one_namespace(self):
+        core = mock.Mock()
+        core.list_namespaced_resource_quota.return_value = NS(items=[])
+        with mock.patch.object(tools_enhanced, "_core", return_value=core):
+            result = await _TOOL_REGISTRY["get_resource_quotas"](namespace="team")
+
+        core.list_namespaced_resource_quota.assert_called_once_with("team", resource_version="0")
+        self.assertEqual(result, {"resource_quotas": []})
+
+
+class DedupePatchTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tools_enhanced._patches.clear()
+
+    async def test_waiter_runs_the_patch_when_the_first_caller_is_cancelled(self):
+        started = asyncio.Event()
+        calls = []
+
+        async def apply_hangs():
+            calls.append("first")
+            started.set()
+            await asyncio.Event().wait()  # never completes on its own
+
+        async def apply_ok():
+            calls.append("waiter")
+            return "patched"
+
+        body = {"spec": {"replicas": 2}}
+        first = asyncio.ensure_future(tools_enhanced._dedupe_patch("scale", "default", "web", body, apply_hangs))
+        await started.wait()
+        waiter = asyncio.ensure_future(tools_enhanced._dedupe_patch("scale", "default", "web", body, apply_ok))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertEqual(await asyncio.wait_for(waiter, timeout=1), "patched")
+        self.assertEqual(calls, ["first", "waiter"])
+
+        # The waiter's successful patch is what gets replayed now
+        result = await tools_enhanced._dedupe_patch("scale", "default", "web", body, apply_hangs)
+        self.assertEqual(result, "patched")
+        self.assertEqual(calls, ["first", "waiter"])
+
+    async def test_earlier_body_is_not_replayed_after_a_different_patch(self):
+        applied = []
+
+        def patch(replicas):
+            async def apply():
+                applied.append(replicas)
+                return {"replicas": replicas}
+            return tools_enhanced._dedupe_patch("scale", "default", "web", {"spec": {"replicas": replicas}}, apply)
+
+        self.assertEqual(await patch(5), {"replicas": 5})
+        self.assertEqual(await patch(3), {"replicas": 3})
+        self.assertEqual(await patch(5), {"replicas": 5})
+        self.assertEqual(applied, [5, 3, 5])
+
+        # The latest body is still deduplicated
+        await patch(5)
+        self.assertEqual(applied, [5, 3, 5])
+
+    async def test_patch_finishing_after_a_newer_one_started_is_not_replayed(self):
+        release = asyncio.Event()
+        applied = []
+
+        async def slow_apply():
+            await release.wait()
+            applied.append(5)
+            return {"replicas": 5}
+
+        async def fast_apply():
+            applied.append(3)
+            return {"replicas": 3}
+
+        older = asyncio.ensure_future(
+            tools_enhanced._dedupe_patch("scale", "default", "web", {"spec": {"replicas": 5}}, slow_apply)
+        )
+        await asyncio.sleep(0)
+        await tools_enhanced._dedupe_patch("scale", "default", "web", {"spec": {"replicas": 3}}, fast_apply)
+        release.set()
+        await older
+
+        await tools_enhanced._dedupe_patch("scale", "default", "web", {"spec": {"replicas": 5}}, slow_apply)
+        self.assertEqual(applied, [3, 5, 5])
+
+
+class ServiceAccountIndexTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tools_enhanced._sa_index_built = (0.0, None)
+
+    async def test_misses_rebuild_the_index_at_most_once_per_min_age(self):
+        binding = NS(
+            metadata=NS(namespace="default", name="reader"),
+            role_ref=NS(name="view"),
+            subjects=[NS(kind="ServiceAccount", name="app", namespace=None)],
+        )
+        rbac = mock.Mock()
+        rbac.list_role_binding_for_all_namespaces.return_value = NS(items=[binding], metadata=NS(_continue=None))
+        rbac.list_cluster_role_binding.return_value = NS(items=[], metadata=NS(_continue=None))
+        check = _TOOL_REGISTRY["check_service_account_permissions"]
+        with mock.patch.object(tools_enhanced, "_rbac", return_value=rbac), \
+                mock.patch.object(tools_enhanced, "get_cluster_cache", return_value=None):
+            found = await check("app")
+            for _ in range(3):
+                missing = await check("nobody")
+
+        self.assertEqual(found["roles_bound"], [{"type": "Role", "name": "view", "namespace": "default"}])
+        self.assertFalse(missing["has_permissions"])
+        self.assertEqual(rbac.list_role_binding_for_all_namespaces.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()